@@ -1,11 +1,22 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from math import *
+from attractor_engine import render_histogram, tone_map
 
 # parameters for calculation
 image_width=1000
 image_height=1000
 number_iterations = image_width * image_height * 2
+number_processes = 1 # None: use all cores, 1: calculate one orbit in a single process
+random_seed = 1 # seed for the starting points of the orbits in the other processes, None: different each run
+histogram_dtype = np.uint32 # np.uint16 uses half the memory, counts above 65535 are clipped
+bilinear_splatting = False # spread each point over the 4 nearest pixels, smoother images with fewer iterations
+supersampling = 1 # 2 or 4: count with bilinear_splatting at 2 or 4 times the resolution, then add blocks of pixels
+# if this file exists the histogram and orbits saved in it by an earlier run with the same parameters
+# are continued, the new result is saved in it at the end, None: no checkpoint file
+checkpoint_filename = None # for example "Gumowski_Mira_checkpoint.npz"
+# progress reports for a job scheduler, see progress_monitor.py
+progress_log = None # JSON lines are appended to this file, for example "Gumowski_Mira_progress.jsonl", "-": print them
+status_file = None # this file always holds the latest report as JSON
 midpoint=(0,0)
 scale=(15,15)
 
@@ -22,42 +33,23 @@ b = 1.0
 # Parameters for viewing
 color_background = "#202020"
 color_map = "nipy_spectral" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_spectral" 
+tone_mapping = "log" # "log", "equalize" (histogram equalization) or "linear"
+gamma = 1.0 # < 1 makes faint areas brighter
 png_filename = "Gumowski_Mira.png"
 text_size = 14
 
-def sign(x):
-    return 1 - 2*(x < 0)
-
 def calc_fractal(N,x_range,y_range):
-    def expr(x):
-        return a * x + 2 * (1 - a) * x**2 / (1 + x**2)**2
-    x1, x2 = x_range
-    y1, y2 = y_range
     print(f"Calculating fractal\n{N} iterations\n{image_height} rows, {image_width} colums")
-    fractal=np.zeros((image_height,image_width))
+    fractal=np.zeros((image_height,image_width), dtype = histogram_dtype)
     x,y=-5.5, -5.0 # initial values
-    step_feedback = N // 10  # only for printing progress
-    for counter in range(N):
-        x_old = x
-        x = b*y + expr(x)
-        y = expr(x) - x_old
-        column = int(image_width * (x - x1) / (x2 - x1))
-        row = int(image_height *(y - y1) / (y2 - y1))
-        if (row > -1) and (row < image_height) and (column > -1) and (column < image_width):
-            fractal[row,column] += 1
-        if counter % step_feedback == 0:
-            print(f"Iteration {counter} of {number_iterations} completed")
+    # the orbit is iterated and counted by attractor_engine.py, compiled when numba is installed
+    render_histogram("gumowski_mira", (a, b), x, y, N, fractal, x_range, y_range,
+                     number_processes = number_processes, random_seed = random_seed,
+                     checkpoint_filename = checkpoint_filename,
+                     splat = bilinear_splatting, supersampling = supersampling,
+                     progress_log = progress_log, status_file = status_file)
     return fractal
 
-def log_convert(fractal):
-    # apply a log conversion for showing and saving fractal
-    # matplotlib.pyplot.imsave() does not seem to support norm="log" option as imshow() does.
-    print("Applying a log conversion for showing and saving fractal")
-    fractal[fractal==0.] = np.nan # avoid log(0) warnings, replace 0.0 with nan
-    fractal = np.log(fractal)
-    fractal[np.isnan(fractal)] = 0. # imsave does not like the nan values, replace nan back with zeros
-    return(fractal)
-
 def save_image(fractal, fname):
     # optionally save the Gumowski-Mira array as an png image file
     print(f"Fractal image of {fractal.shape} created")
@@ -65,7 +57,7 @@ def save_image(fractal, fname):
     if answer == "y":
         plt.imsave(fname,
             fractal, 
-            cmap = color_map, 
+            cmap = color_map, vmin = 0, vmax = 255,
             origin='upper')
         print(f"Saved as \"{fname}\"")
 
@@ -76,16 +68,20 @@ def plot_fractal(fractal):
     plt.title("Gumowski-Mira Fractal", 
                 fontsize = text_size + 2, fontweight = "bold", y = 1.02)
     plt.imshow(fractal, 
-        cmap = color_map, 
+        cmap = color_map, vmin = 0, vmax = 255,
         origin='upper')
     plt.subplots_adjust(left = 0.05, right = 0.95, bottom = 0.05, top = 0.915)
     plt.show()
 
-# calculate fractal
-pixel_array = calc_fractal(number_iterations, xrange, yrange)
-# log convertion to make smaller values more visible
-pixel_array = log_convert(pixel_array)
-# optionally save as png image file
-save_image(pixel_array, png_filename)
-# display fractal
-plot_fractal(pixel_array)
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the orbits import it
+if __name__ == "__main__":
+    # calculate fractal
+    pixel_array = calc_fractal(number_iterations, xrange, yrange)
+    # log, equalize or linear conversion to 0...255 to make smaller values more visible
+    print(f"Applying a {tone_mapping} conversion for showing and saving fractal")
+    pixel_array = tone_map(pixel_array, tone_mapping, gamma)
+    # optionally save as png image file
+    save_image(pixel_array, png_filename)
+    # display fractal
+    plot_fractal(pixel_array)
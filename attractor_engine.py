@@ -0,0 +1,633 @@
+# Attractor engine
+# Shared code to calculate density images of strange attractors such as the King's Dream,
+# Hopalong, Tinkerbell, Quadrup Two and Gumowski-Mira maps, used by kings_dream_cpython.py,
+# hopalong.py, tinkerbell.py, quadrup_two.py and Gumowski_Mira.py
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+#
+# Each map is a small step function (x, y, p) -> (x, y) registered under a name, p is a tuple
+# with the constants of the map. The orbit is iterated and every point is counted in an integer
+# histogram with one pixel per bin. When the numba library is installed the loop and the step
+# functions are compiled to machine code, otherwise the same loop runs in plain Python.
+# The compiled code calculates x**2 as x * x, CPython calls pow() which can differ in the last bit,
+# the chaotic orbits amplify this so compiled and plain Python images are only statistically the same.
+
+import os
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import sin, sqrt, log, atan, floor
+
+import numpy as np
+from progress_monitor import ProgressMonitor, update_counter
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# **** maps ***************
+
+# registered maps: name -> (step function, names of the constants in p)
+attractor_maps = {}
+
+def register_map(name, parameter_names):
+    def register(step):
+        attractor_maps[name] = (step, parameter_names)
+        return step
+    return register
+
+@register_map("kings_dream", ("a", "b", "c", "d"))
+def kings_dream_step(x, y, p):
+    return sin(p[0] * x) + p[1] * sin(p[0] * y), sin(p[2] * x) + p[3] * sin(p[2] * y)
+
+@register_map("hopalong", ("a", "b", "c"))
+def hopalong_step(x, y, p):
+    # (1 - 2 * (x - 1 < 0)) is the sign of x - 1, +1 for x = 1
+    return y - 1 - sqrt(abs(p[1] * x - 1 - p[2])) * (1 - 2 * (x - 1 < 0)), p[0] - x - 1
+
+@register_map("tinkerbell", ("a", "b", "c", "d"))
+def tinkerbell_step(x, y, p):
+    return x**2 - y**2 + p[0] * x + p[1] * y, 2 * x * y + p[2] * x + p[3] * y
+
+@register_map("quadrup_two", ("a", "b", "c"))
+def quadrup_two_step(x, y, p):
+    # (1 - 2 * (x < 0)) is the sign of x, +1 for x = 0
+    return y - (1 - 2 * (x < 0)) * sin(log(abs(p[1] * x - p[2]))) * atan((p[2] * x - p[1])**2), p[0] - x
+
+@register_map("gumowski_mira", ("a", "b"))
+def gumowski_mira_step(x, y, p):
+    # f(x) = a * x + 2 * (1 - a) * x**2 / (1 + x**2)**2
+    # x_new = b * y + f(x), y_new = f(x_new) - x
+    a, b = p[0], p[1]
+    x_new = b * y + (a * x + 2 * (1 - a) * x**2 / (1 + x**2)**2)
+    return x_new, a * x_new + 2 * (1 - a) * x_new**2 / (1 + x_new**2)**2 - x
+
+# **** orbit loops ***************
+
+# with bilinear splatting a point is spread over the 4 pixels around it, each gets a part of
+# splat_weight according to the distance to its center, the histogram then counts in units of
+# 1 / splat_weight point, this gives smoother images than adding 1 to the nearest pixel
+splat_weight = 16
+
+# iterate the orbit number_iterations times starting from x, y and add each point which falls
+# inside x1 <= x < x2, y1 <= y < y2 to histogram (rows: y, columns: x), returns the last x, y
+# the position in the image is compared before the conversion to int, a NaN or infinite value
+# of a diverging orbit is simply not counted
+# maximum: the largest value of the histogram type, counts stop there instead of overflowing
+# splat: 0: add 1 to the pixel of each point, > 0: bilinear splatting with this total weight
+def _orbit_loop(step, p, x, y, number_iterations, histogram, x1, x2, y1, y2, maximum, splat):
+    height, width = histogram.shape
+    for counter in range(number_iterations):
+        x, y = step(x, y, p)
+        column = width * (x - x1) / (x2 - x1)
+        row = height * (y - y1) / (y2 - y1)
+        if splat == 0:
+            if row > -1 and row < height and column > -1 and column < width:
+                if histogram[int(row), int(column)] < maximum:
+                    histogram[int(row), int(column)] += 1
+        else:
+            # position relative to the pixel centers
+            column -= 0.5
+            row -= 0.5
+            if row > -1 and row < height and column > -1 and column < width:
+                row0 = floor(row)
+                column0 = floor(column)
+                row_fraction = row - row0
+                column_fraction = column - column0
+                # corners 3, 2, 1 get their rounded down part, corner 0 the rest of splat
+                remainder = splat
+                for corner in range(3, -1, -1):
+                    r = row0 + corner // 2
+                    c = column0 + corner % 2
+                    if corner > 0:
+                        weight = int((row_fraction if corner >= 2 else 1.0 - row_fraction)
+                                     * (column_fraction if corner % 2 == 1 else 1.0 - column_fraction) * splat)
+                        remainder -= weight
+                    else:
+                        weight = remainder
+                    if r >= 0 and r < height and c >= 0 and c < width:
+                        if histogram[r, c] < maximum - weight:
+                            histogram[r, c] += weight
+                        else:
+                            histogram[r, c] = maximum
+    return x, y
+
+# the same loop in plain Python, the indices of the points are collected in a list and counted
+# at the end with np.bincount, this is much faster than adding 1 to a numpy array each time
+def _orbit_loop_python(step, p, x, y, number_iterations, histogram, x1, x2, y1, y2, maximum, splat):
+    height, width = histogram.shape
+    x_scale = width / (x2 - x1)
+    y_scale = height / (y2 - y1)
+    if splat > 0:
+        # the positions are collected and splatted with numpy at the end
+        xs = []
+        ys = []
+        for counter in range(number_iterations):
+            x, y = step(x, y, p)
+            xs.append(x)
+            ys.append(y)
+        with np.errstate(all = "ignore"):
+            _splat_points(histogram, x_scale * (np.array(xs) - x1), y_scale * (np.array(ys) - y1), splat)
+        return x, y
+    indices = []
+    append = indices.append
+    for counter in range(number_iterations):
+        x, y = step(x, y, p)
+        column = x_scale * (x - x1)
+        row = y_scale * (y - y1)
+        if -1 < row < height and -1 < column < width:
+            append(int(row) * width + int(column))
+    add_counts(histogram, np.bincount(indices, minlength = height * width).reshape(height, width))
+    return x, y
+
+# bilinear splatting of arrays of points at image positions columns, rows, as in _orbit_loop(),
+# the same points get the same weights, but the compiled orbits of maps which use x**2 are not
+# the same points as in plain Python (see the top of this file)
+def _splat_points(histogram, columns, rows, splat):
+    height, width = histogram.shape
+    columns = columns - 0.5
+    rows = rows - 0.5
+    inside = (rows > -1) & (rows < height) & (columns > -1) & (columns < width)
+    columns = columns[inside]
+    rows = rows[inside]
+    row0 = np.floor(rows)
+    column0 = np.floor(columns)
+    row_fraction = rows - row0
+    column_fraction = columns - column0
+    row0 = row0.astype(np.intp)
+    column0 = column0.astype(np.intp)
+    counts = np.zeros(height * width, dtype = np.int64)
+    remainder = np.full(len(rows), splat, dtype = np.int64)
+    for corner in (3, 2, 1, 0):
+        r = row0 + corner // 2
+        c = column0 + corner % 2
+        if corner > 0:
+            weight = ((row_fraction if corner >= 2 else 1.0 - row_fraction)
+                      * (column_fraction if corner % 2 == 1 else 1.0 - column_fraction) * splat).astype(np.int64)
+            remainder -= weight
+        else:
+            weight = remainder
+        valid = (r >= 0) & (r < height) & (c >= 0) & (c < width)
+        counts += np.bincount(r[valid] * width + c[valid], weights = weight[valid],
+                              minlength = height * width).astype(np.int64)
+    add_counts(histogram, counts.reshape(height, width))
+
+# add counts to an integer histogram in place, values which would overflow the type of the
+# histogram stop at its largest value instead (saturation), so np.uint16 can be used safely
+def add_counts(histogram, counts):
+    headroom = np.iinfo(histogram.dtype).max - histogram
+    np.add(histogram, np.minimum(counts, headroom), out = histogram, casting = "unsafe")
+
+# compiled versions of the loop and of the step functions, made when first used, they do not
+# round x**2 exactly as CPython does (see above)
+_compiled_steps = {}
+_compiled_loop = None
+
+def orbit_loop(name):
+    global _compiled_loop
+    step = attractor_maps[name][0]
+    if njit is None:
+        return _orbit_loop_python, step
+    if _compiled_loop is None:
+        # nogil: a ProgressMonitor thread can run while the compiled loop runs
+        _compiled_loop = njit(_orbit_loop, cache = True, nogil = True)
+    if name not in _compiled_steps:
+        _compiled_steps[name] = njit(step, cache = True)
+    return _compiled_loop, _compiled_steps[name]
+
+# **** histogram ***************
+
+# add number_iterations points of the orbit of map name starting at x, y to histogram,
+# histogram is an integer array (rows, columns) for the area x_range, y_range, normally np.uint32,
+# np.uint16 uses half the memory, its counts stop at 65535
+# constants: the constants of the map in the order of its parameter_names
+# the orbit is calculated in parts of feedback_step iterations, after each part the progress
+# is printed, feedback_step = 0: no progress messages
+# progress_counter: the counter of a ProgressMonitor, after each part the number of iterations
+# is added to it instead of printing the progress
+# splat: use bilinear splatting, the histogram counts in units of 1 / splat_weight point
+# returns the last x, y of the orbit so it can be continued later
+def orbit_histogram(name, constants, x, y, number_iterations, histogram, x_range, y_range,
+                    feedback_step = None, splat = False, progress_counter = None):
+    loop, step = orbit_loop(name)
+    p = tuple(float(value) for value in constants)
+    x1, x2 = (float(value) for value in x_range)
+    y1, y2 = (float(value) for value in y_range)
+    maximum = int(np.iinfo(histogram.dtype).max)
+    if progress_counter is not None:
+        # parts of about 10 ms compiled and 0.25 s in plain Python
+        feedback_step = 0
+        part = 2**20 if njit is not None else 2**18
+    else:
+        if feedback_step is None:
+            feedback_step = max(1, number_iterations // 10)
+        part = feedback_step if feedback_step > 0 else number_iterations
+    done = 0
+    while done < number_iterations:
+        number = min(part, number_iterations - done)
+        x, y = loop(step, p, float(x), float(y), number, histogram, x1, x2, y1, y2, maximum,
+                    splat_weight if splat else 0)
+        done += number
+        if progress_counter is not None:
+            update_counter(progress_counter, number)
+        if feedback_step > 0:
+            print(f"Iteration {done} of {number_iterations} completed")
+    return x, y
+
+# **** several processes ***************
+
+# the counter of the ProgressMonitor of the main process as seen by a worker process
+_worker_counter = None
+
+def _set_worker_counter(counter):
+    global _worker_counter
+    _worker_counter = counter
+
+# one orbit segment calculated in a worker process into its own histogram,
+# returns the histogram and the last x, y of the segment
+def _segment_histogram(name, constants, x, y, number_iterations, shape, x_range, y_range, splat):
+    histogram = np.zeros(shape, dtype = np.uint32)
+    x, y = orbit_histogram(name, constants, x, y, number_iterations, histogram, x_range, y_range,
+                           feedback_step = 0, splat = splat, progress_counter = _worker_counter)
+    return histogram, x, y
+
+# add the histograms together in pairs, then the pair sums in pairs, and so on
+def tree_reduce(histograms):
+    histograms = list(histograms)
+    while len(histograms) > 1:
+        for i in range(0, len(histograms) - 1, 2):
+            add_counts(histograms[i], histograms[i + 1])
+        histograms = histograms[::2]
+    return histograms[0]
+
+# add number_iterations points to histogram like orbit_histogram() but split over number_processes
+# orbits which are calculated in parallel, each in its own np.uint32 histogram, these are added
+# together at the end
+# the first orbit starts at x, y, the others at x, y moved by a random amount of at most
+# seed_spread, taken from random_seed so the image is the same every run (None: different each run)
+# the orbits are chaotic so they separate quickly, for maps where the image grows slowly along a
+# single orbit (hopalong, Quadrup Two) a few long orbits are better than many short ones
+# number_processes: None: use all cores, 1: one orbit in this process, same as orbit_histogram()
+# x and y can also be lists of the last points of the orbits of an earlier run, these orbits are
+# then continued instead, one orbit for each point
+# iterations_done: the number of iterations of the earlier run, the iterations are divided over the
+# orbits as if they were dealt out one by one in turn from the start, so a continued run gives each
+# orbit the same total as one uninterrupted run
+# progress_counter: the counter of a ProgressMonitor, the progress of all orbits is added to it
+# returns the last x, y of every orbit
+def parallel_orbit_histogram(name, constants, x, y, number_iterations, histogram, x_range, y_range,
+                             number_processes = None, random_seed = 1, seed_spread = 1e-6,
+                             feedback = True, splat = False, progress_counter = None,
+                             iterations_done = 0):
+    if number_processes is None:
+        number_processes = os.cpu_count() or 1
+    if np.ndim(x) > 0:
+        starts = list(zip(np.ravel(x), np.ravel(y)))
+    else:
+        starts = [(x, y)]
+        for seed in np.random.SeedSequence(random_seed).spawn(number_processes - 1):
+            dx, dy = np.random.default_rng(seed).uniform(-seed_spread, seed_spread, 2)
+            starts.append((x + dx, y + dy))
+    number_orbits = len(starts)
+    if number_processes == 1 and number_orbits == 1:
+        return [orbit_histogram(name, constants, *starts[0], number_iterations, histogram,
+                                x_range, y_range, feedback_step = None if feedback else 0, splat = splat,
+                                progress_counter = progress_counter)]
+    # orbit i gets the iterations i, i + number_orbits, i + 2 * number_orbits ... of all iterations
+    # done so far, minus those it got in the earlier run
+    def dealt(total, i):
+        return (total - i + number_orbits - 1) // number_orbits
+    numbers = [dealt(iterations_done + number_iterations, i) - dealt(iterations_done, i)
+               for i in range(number_orbits)]
+    if number_processes == 1:
+        ends = []
+        for i, ((x_start, y_start), number) in enumerate(zip(starts, numbers)):
+            ends.append(orbit_histogram(name, constants, x_start, y_start, number, histogram,
+                                        x_range, y_range, feedback_step = 0, splat = splat,
+                                        progress_counter = progress_counter))
+            if feedback:
+                print(f"Orbit {i + 1} of {number_orbits} completed")
+        return ends
+    partials = [None] * number_orbits
+    ends = [None] * number_orbits
+    with ProcessPoolExecutor(max_workers = number_processes, initializer = _set_worker_counter,
+                             initargs = (progress_counter,)) as executor:
+        futures = {executor.submit(_segment_histogram, name, constants, x_start, y_start, number,
+                                   histogram.shape, x_range, y_range, splat): i
+                   for i, ((x_start, y_start), number) in enumerate(zip(starts, numbers))}
+        for completed, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            partials[i], x_end, y_end = future.result()
+            ends[i] = (x_end, y_end)
+            if feedback:
+                print(f"Orbit {completed} of {number_orbits} completed")
+    add_counts(histogram, tree_reduce(partials))
+    return ends
+
+# **** ensemble of orbits ***************
+
+# numpy versions of the math functions used by the step functions
+_vector_functions = {"sin": np.sin, "sqrt": np.sqrt, "log": np.log, "atan": np.arctan}
+
+# the step function of map name working on numpy arrays of x and y values: the same code with
+# the numpy functions in place of the math functions
+def vector_step(name):
+    step = attractor_maps[name][0]
+    namespace = dict(step.__globals__, **_vector_functions)
+    return types.FunctionType(step.__code__, namespace, step.__name__)
+
+# add about number_iterations points to histogram from number_seeds orbits which are iterated
+# together as numpy arrays, this replaces one long serial orbit by wide numpy operations
+# the seeds start at random positions within x +- seed_spread, y +- seed_spread, the first
+# burn_in points of every orbit are not counted so they can settle on the attractor first
+# orbits which diverge to an infinite or NaN value are dropped after the burn in
+# random_seed: seed for the random start positions, None gives different positions each run
+# x and y can also be arrays with the last points of the orbits of an earlier run, these orbits
+# are then continued without a new burn in
+# splat: use bilinear splatting, the histogram counts in units of 1 / splat_weight point
+# progress_counter: the counter of a ProgressMonitor, the points of each step are added to it
+# instead of printing the progress
+# returns the arrays with the last x and y values of the orbits
+def ensemble_histogram(name, constants, x, y, number_iterations, histogram, x_range, y_range,
+                       number_seeds = 10000, burn_in = 100, seed_spread = 0.1,
+                       random_seed = None, feedback_step = None, splat = False,
+                       progress_counter = None):
+    step = vector_step(name)
+    p = tuple(float(value) for value in constants)
+    x1, x2 = (float(value) for value in x_range)
+    y1, y2 = (float(value) for value in y_range)
+    height, width = histogram.shape
+    x_scale = width / (x2 - x1)
+    y_scale = height / (y2 - y1)
+    if np.ndim(x) > 0:
+        xs = np.array(x, dtype = np.float64)
+        ys = np.array(y, dtype = np.float64)
+        burn_in = 0
+    else:
+        rng = np.random.default_rng(random_seed)
+        xs = x + rng.uniform(-seed_spread, seed_spread, number_seeds)
+        ys = y + rng.uniform(-seed_spread, seed_spread, number_seeds)
+    number_steps = max(1, number_iterations // max(1, len(xs)))
+    if progress_counter is not None:
+        feedback_step = 0
+    elif feedback_step is None:
+        feedback_step = max(1, number_iterations // 10)
+    # the flat indices of the points are collected and counted with np.bincount once there
+    # are about as many as there are pixels, with splatting the positions are collected
+    collected = []
+    number_collected = 0
+    number_counted = 0
+    next_feedback = feedback_step
+    with np.errstate(all = "ignore"):
+        for counter in range(burn_in):
+            xs, ys = step(xs, ys, p)
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        xs, ys = xs[finite], ys[finite]
+        for counter in range(number_steps):
+            xs, ys = step(xs, ys, p)
+            columns = x_scale * (xs - x1)
+            rows = y_scale * (ys - y1)
+            if splat:
+                collected.append((columns, rows))
+                number_collected += len(columns)
+            else:
+                inside = (rows > -1) & (rows < height) & (columns > -1) & (columns < width)
+                indices = rows[inside].astype(np.intp) * width + columns[inside].astype(np.intp)
+                collected.append(indices)
+                number_collected += len(indices)
+            number_counted += len(xs)
+            if progress_counter is not None:
+                update_counter(progress_counter, len(xs))
+            if number_collected >= histogram.size or counter == number_steps - 1:
+                if splat:
+                    _splat_points(histogram, np.concatenate([c for c, r in collected]),
+                                  np.concatenate([r for c, r in collected]), splat_weight)
+                else:
+                    counts = np.bincount(np.concatenate(collected), minlength = height * width)
+                    add_counts(histogram, counts.reshape(height, width))
+                collected = []
+                number_collected = 0
+            if feedback_step > 0 and (number_counted >= next_feedback or counter == number_steps - 1):
+                print(f"Iteration {number_counted} of {number_iterations} completed")
+                next_feedback += feedback_step
+    return xs, ys
+
+# **** tone mapping ***************
+
+# convert a histogram of counts to a np.uint8 image for a color map in a single pass:
+# a lookup table with the gray value for every distinct count is made first, then each pixel is
+# looked up in it, the table is never larger than the image even when one pixel has a huge count
+# method: "log": log(count), like the log conversion used before
+#         "linear": count
+#         "equalize": histogram equalization, the fraction of the visited pixels which have
+#         a lower or equal count, this spreads the gray values evenly over the image
+# the result is scaled to 0...1, raised to the power gamma (< 1 makes faint areas brighter)
+# and scaled to 0...255, pixels which are never visited stay 0
+def tone_map(histogram, method = "log", gamma = 1.0):
+    # counts: the distinct counts in increasing order, index: the position of each pixel's count
+    counts, index = np.unique(histogram, return_inverse = True)
+    counts = counts.astype(np.float64)
+    if method == "log":
+        # log(1) = 0 just like the count 0
+        table = np.log(np.maximum(counts, 1.0))
+    elif method == "linear":
+        table = counts
+    elif method == "equalize":
+        number_pixels = np.bincount(index.ravel(), minlength = len(counts))
+        number_pixels[counts == 0] = 0
+        table = np.cumsum(number_pixels, dtype = np.float64)
+    else:
+        raise ValueError(f"unknown tone mapping method {method!r}")
+    if table[-1] > 0:
+        table /= table[-1]
+    table[counts == 0] = 0.0
+    if gamma != 1.0:
+        table **= gamma
+    table = np.round(table * 255).astype(np.uint8)
+    return table[index].reshape(histogram.shape)
+
+# **** checkpoints ***************
+
+# a checkpoint is a numpy .npz file with the histogram, the last points of the orbits and the
+# number of iterations done so far, together with the parameters it was calculated for
+def save_checkpoint(filename, name, constants, histogram, x_range, y_range, x, y, counter,
+                    number_seeds = 0, splat = False):
+    # written to a temporary file first, an interrupted run does not damage the old checkpoint
+    with open(filename + ".tmp", "wb") as file:
+        np.savez(file, name = name, constants = np.array(constants, dtype = np.float64),
+                 histogram = histogram, x_range = np.array(x_range, dtype = np.float64),
+                 y_range = np.array(y_range, dtype = np.float64), x = np.ravel(x), y = np.ravel(y),
+                 counter = counter, number_seeds = number_seeds, splat = splat)
+    os.replace(filename + ".tmp", filename)
+
+# the checkpoint as a dictionary, None if the file does not exist or it was calculated
+# for other parameters
+def load_checkpoint(filename, name, constants, shape, x_range, y_range, number_seeds = 0,
+                    splat = False):
+    if not os.path.exists(filename):
+        return None
+    with np.load(filename) as file:
+        checkpoint = {key: file[key] for key in file.files}
+    if (str(checkpoint["name"]) != name
+            or not np.array_equal(checkpoint["constants"], np.array(constants, dtype = np.float64))
+            or checkpoint["histogram"].shape != tuple(shape)
+            or not np.array_equal(checkpoint["x_range"], np.array(x_range, dtype = np.float64))
+            or not np.array_equal(checkpoint["y_range"], np.array(y_range, dtype = np.float64))
+            or int(checkpoint["number_seeds"]) != number_seeds
+            or bool(checkpoint.get("splat", False)) != splat):
+        print(f"Checkpoint \"{filename}\" is for other parameters, it is not used")
+        return None
+    return checkpoint
+
+# **** complete render ***************
+
+# add number_iterations points of map name to histogram with one of the methods above:
+# number_seeds > 0: ensemble_histogram() with that number of orbits
+# otherwise parallel_orbit_histogram() with number_processes orbits
+# checkpoint_filename: if this file exists and was made with the same parameters, its histogram
+# is added and its orbits are continued, so a render can be refined with more iterations over
+# several runs, at the end the new state is written to this file, None: no checkpoint
+# splat: bilinear splatting, the histogram counts in units of 1 / splat_weight point
+# supersampling: 2 or 4: the points are counted in a histogram with 2 or 4 times more rows and
+# columns, at the end blocks of supersampling x supersampling pixels are added together, together
+# with splat this gives smooth anti-aliased images with fewer iterations (16 times more memory for 4)
+# the progress is reported by a ProgressMonitor every second, it is also appended as JSON lines
+# to progress_log and/or written to status_file when these are given, see progress_monitor.py
+# returns the total number of iterations including those of the checkpoint
+def render_histogram(name, constants, x, y, number_iterations, histogram, x_range, y_range,
+                     number_processes = 1, random_seed = 1, number_seeds = 0, burn_in = 100,
+                     checkpoint_filename = None, splat = False, supersampling = 1,
+                     progress_log = None, status_file = None):
+    height, width = histogram.shape
+    if supersampling > 1:
+        samples = np.zeros((height * supersampling, width * supersampling), dtype = histogram.dtype)
+    else:
+        samples = histogram
+    counter = 0
+    if checkpoint_filename is not None:
+        checkpoint = load_checkpoint(checkpoint_filename, name, constants, samples.shape,
+                                     x_range, y_range, number_seeds, splat)
+        if checkpoint is not None:
+            add_counts(samples, checkpoint["histogram"])
+            x, y = checkpoint["x"], checkpoint["y"]
+            counter = int(checkpoint["counter"])
+            print(f"Continuing from \"{checkpoint_filename}\" after {counter} iterations")
+    # with several processes the fill ratio is only known at the end
+    with ProgressMonitor(number_iterations, label = name, histogram = samples,
+                         log_filename = progress_log, status_filename = status_file) as monitor:
+        if number_seeds > 0:
+            x_ends, y_ends = ensemble_histogram(name, constants, x, y, number_iterations, samples,
+                                                x_range, y_range, number_seeds = number_seeds,
+                                                burn_in = burn_in, random_seed = random_seed,
+                                                splat = splat, progress_counter = monitor.counter)
+        else:
+            ends = parallel_orbit_histogram(name, constants, x, y, number_iterations, samples,
+                                            x_range, y_range, number_processes = number_processes,
+                                            random_seed = random_seed, feedback = False,
+                                            splat = splat, progress_counter = monitor.counter,
+                                            iterations_done = counter)
+            x_ends, y_ends = zip(*ends)
+    counter += number_iterations
+    if checkpoint_filename is not None:
+        save_checkpoint(checkpoint_filename, name, constants, samples, x_range, y_range,
+                        x_ends, y_ends, counter, number_seeds, splat)
+        print(f"Checkpoint after {counter} iterations saved as \"{checkpoint_filename}\"")
+    if supersampling > 1:
+        add_counts(histogram, samples.reshape(height, supersampling, width, supersampling).sum(axis = (1, 3)))
+    return counter
+
+# **** parameter scan ***************
+
+# short orbits for many sets of constants at once, to find constants which give interesting images
+# constants: array (number of sets, number of constants of the map), all orbits start at x, y
+# the orbits are iterated together as numpy arrays with vector_step(), the constants are arrays
+# with one value per set, orbits are dropped as soon as they are rejected:
+# - diverged: the orbit became infinite, NaN or larger than bound
+# - cycle: after the transient the orbit returns within tolerance to its first point within
+#   max_period iterations, a fixed point is a cycle of period 1
+# for the remaining orbits the next number_iterations points are used for
+# - lyapunov: the largest Lyapunov exponent, the average growth rate of the distance to a
+#   neighbouring orbit, > 0 for a chaotic orbit
+# - fill_ratio: the fraction of the cells of a grid_size x grid_size grid over the bounding box of
+#   the orbit which it visits, small for orbits on a curve or a few points
+# returns a dictionary of arrays with one value per set: "lyapunov", "fill_ratio" (both NaN for
+# rejected sets), "rejected" ("" or the reason) and "x_range", "y_range" (bounding boxes)
+def orbit_statistics(name, constants, x, y, number_iterations = 2000, transient = 500,
+                     grid_size = 64, max_period = 64, tolerance = 1e-9, bound = 1e6):
+    step = vector_step(name)
+    constants = np.asarray(constants, dtype = np.float64)
+    number_sets = len(constants)
+    rejected = np.full(number_sets, "", dtype = "<U8")
+    lyapunov = np.full(number_sets, np.nan)
+    fill_ratio = np.full(number_sets, np.nan)
+    x_range = np.full((number_sets, 2), np.nan)
+    y_range = np.full((number_sets, 2), np.nan)
+    # index of the sets which are still iterated, with their constants and points
+    active = np.arange(number_sets)
+    p = tuple(constants[:, i] for i in range(constants.shape[1]))
+    xs = np.full(number_sets, float(x))
+    ys = np.full(number_sets, float(y))
+
+    def reject(keep, reason):
+        nonlocal active, p, xs, ys
+        rejected[active[~keep]] = reason
+        active = active[keep]
+        p = tuple(values[keep] for values in p)
+        xs, ys = xs[keep], ys[keep]
+        return keep
+
+    def diverged():
+        return ~(np.isfinite(xs) & np.isfinite(ys) & (np.abs(xs) < bound) & (np.abs(ys) < bound))
+
+    with np.errstate(all = "ignore"):
+        for counter in range(transient):
+            xs, ys = step(xs, ys, p)
+            if counter % 50 == 49:
+                reject(~diverged(), "diverged")
+        reject(~diverged(), "diverged")
+        # cycles and fixed points
+        x_first, y_first = xs.copy(), ys.copy()
+        returned = np.zeros(len(xs), dtype = bool)
+        for counter in range(max_period):
+            xs, ys = step(xs, ys, p)
+            returned |= (np.abs(xs - x_first) <= tolerance) & (np.abs(ys - y_first) <= tolerance)
+        keep = reject(~returned, "cycle")
+        x_first, y_first = x_first[keep], y_first[keep]
+        reject(~diverged(), "diverged")
+        # the largest Lyapunov exponent from a neighbouring orbit at distance d0, the distance
+        # is set back to d0 after each step
+        d0 = 1e-8
+        x_near, y_near = xs + d0, ys.copy()
+        log_growth = np.zeros(len(xs))
+        samples_x = np.empty((number_iterations, len(xs)))
+        samples_y = np.empty((number_iterations, len(xs)))
+        for counter in range(number_iterations):
+            xs, ys = step(xs, ys, p)
+            x_near, y_near = step(x_near, y_near, p)
+            distance = np.hypot(x_near - xs, y_near - ys)
+            log_growth += np.log(distance / d0)
+            # a collapsed neighbour (distance 0) is placed back at d0 in the x direction
+            scale = np.where(distance > 0, d0 / distance, 0.0)
+            x_near = xs + (x_near - xs) * scale + np.where(distance > 0, 0.0, d0)
+            y_near = ys + (y_near - ys) * scale
+            samples_x[counter] = xs
+            samples_y[counter] = ys
+        finite = np.isfinite(samples_x).all(axis = 0) & np.isfinite(samples_y).all(axis = 0)
+        samples_x, samples_y = samples_x[:, finite], samples_y[:, finite]
+        log_growth = log_growth[finite]
+        reject(finite, "diverged")
+        # visited cells of a grid over the bounding box of each orbit
+        x_low, x_high = samples_x.min(axis = 0), samples_x.max(axis = 0)
+        y_low, y_high = samples_y.min(axis = 0), samples_y.max(axis = 0)
+        x_width = np.maximum(x_high - x_low, 1e-300)
+        y_width = np.maximum(y_high - y_low, 1e-300)
+        columns = np.minimum((grid_size * (samples_x - x_low) / x_width).astype(np.intp), grid_size - 1)
+        rows = np.minimum((grid_size * (samples_y - y_low) / y_width).astype(np.intp), grid_size - 1)
+        cells = (np.arange(len(active)) * grid_size + rows) * grid_size + columns
+        visited = np.bincount(cells.ravel(), minlength = len(active) * grid_size**2) > 0
+    lyapunov[active] = log_growth / number_iterations
+    fill_ratio[active] = visited.reshape(len(active), -1).mean(axis = 1)
+    x_range[active] = np.column_stack((x_low, x_high))
+    y_range[active] = np.column_stack((y_low, y_high))
+    return {"lyapunov": lyapunov, "fill_ratio": fill_ratio, "rejected": rejected,
+            "x_range": x_range, "y_range": y_range}
@@ -0,0 +1,115 @@
+# Parameter scan for strange attractors
+# This code searches constants for the King's Dream, Gumowski-Mira or the other maps of
+# attractor_engine.py which give interesting images. Thousands of random sets of constants are
+# tried with short orbits, calculated together as numpy arrays and spread over several processes.
+# Sets whose orbit diverges, ends in a fixed point or a cycle, or covers too few cells of a grid
+# over its bounding box are rejected early. The remaining sets are ranked by their Lyapunov
+# exponent or fill ratio and only the best ones are rendered as full images and saved.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+from attractor_engine import attractor_maps, orbit_statistics, render_histogram, tone_map
+
+# Parameters for the scan
+map_name = "kings_dream" # one of the maps in attractor_engine.py
+constant_ranges = [(-3, 3), (-3, 3), (-3, 3), (-3, 3)] # (low, high) for each constant a, b, c, d
+#map_name = "gumowski_mira" # its orbits have Lyapunov exponents close to 0, rank by "fill_ratio"
+#constant_ranges = [(-1, 1), (0.95, 1.0)]
+x_initial, y_initial = 0.1, 0.1 # start of every orbit
+number_sets = 20000 # number of random sets of constants
+random_seed = 1 # None: other sets each run
+scan_iterations = 1000 # points of each short orbit
+sets_per_chunk = 500 # sets calculated together in one process
+number_processes = None # None: use all cores, 1: calculate in a single process
+min_fill_ratio = 0.1 # reject orbits which visit fewer cells of a 64 x 64 grid
+rank_by = "lyapunov" # "lyapunov" or "fill_ratio"
+# Parameters for the full renders of the best sets
+top_k = 6
+image_width = 800
+image_height = 800
+render_iterations = 4000000
+margin = 0.05 # space around the bounding box of the orbit, as fraction of its size
+color_map = "inferno" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_spectral"
+png_prefix = "attractor_scan_" # the images are named attractor_scan_1.png, attractor_scan_2.png, ...
+color_background = "#202020"
+text_size = 10
+
+# scan one chunk of sets of constants
+def scan_chunk(constants):
+    return orbit_statistics(map_name, constants, x_initial, y_initial,
+                            number_iterations = scan_iterations)
+
+def scan(constants):
+    chunks = [constants[start:start + sets_per_chunk]
+              for start in range(0, len(constants), sets_per_chunk)]
+    if number_processes == 1:
+        results = []
+        for i, chunk in enumerate(chunks):
+            results.append(scan_chunk(chunk))
+            print(f"Chunk {i + 1} of {len(chunks)} completed\r", end = "")
+    else:
+        with ProcessPoolExecutor(max_workers = number_processes) as executor:
+            results = list(executor.map(scan_chunk, chunks))
+    print()
+    return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+# full image of the attractor for one set of constants on its bounding box
+def render(constants, x_range, y_range):
+    x_margin = margin * (x_range[1] - x_range[0])
+    y_margin = margin * (y_range[1] - y_range[0])
+    histogram = np.zeros((image_height, image_width), dtype = np.uint32)
+    render_histogram(map_name, constants, x_initial, y_initial, render_iterations, histogram,
+                     (x_range[0] - x_margin, x_range[1] + x_margin),
+                     (y_range[0] - y_margin, y_range[1] + y_margin))
+    return tone_map(histogram, "log")
+
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which scan the chunks import it
+if __name__ == "__main__":
+    print("Parameter scan for strange attractors using Python and numpy")
+    print("------------------------------------------------------------")
+    parameter_names = attractor_maps[map_name][1]
+    rng = np.random.default_rng(random_seed)
+    low, high = np.array(constant_ranges, dtype = np.float64).T
+    constants = rng.uniform(low, high, (number_sets, len(parameter_names)))
+    print(f"Scanning {number_sets} sets of constants {', '.join(parameter_names)} "
+          f"for the {map_name} map with {scan_iterations} iterations each")
+    start_time = time.perf_counter()
+    statistics = scan(constants)
+    rejected = statistics["rejected"]
+    fill_ratio = statistics["fill_ratio"]
+    low_fill = (rejected == "") & ~(fill_ratio >= min_fill_ratio)
+    rejected[low_fill] = "coverage"
+    print(f"Scan completed in {time.perf_counter() - start_time:.1f} s")
+    for reason in ("diverged", "cycle", "coverage"):
+        print(f"{np.count_nonzero(rejected == reason)} sets rejected: {reason}")
+    survivors = np.flatnonzero(rejected == "")
+    print(f"{len(survivors)} sets remaining")
+    if len(survivors) == 0:
+        sys.exit()
+    order = survivors[np.argsort(-statistics[rank_by][survivors])][:top_k]
+    # full renders of the best sets
+    fig = plt.figure(figsize = (15, 10), num = "Attractor scan", facecolor = color_background)
+    plt.style.use('dark_background')
+    columns = int(np.ceil(np.sqrt(len(order))))
+    rows = int(np.ceil(len(order) / columns))
+    for rank, i in enumerate(order, 1):
+        values = ", ".join(f"{name} = {value:.6f}" for name, value in zip(parameter_names, constants[i]))
+        print(f"{rank}: {values}, Lyapunov exponent {statistics['lyapunov'][i]:.3f}, "
+              f"fill ratio {fill_ratio[i]:.3f}")
+        image = render(constants[i], statistics["x_range"][i], statistics["y_range"][i])
+        filename = f"{png_prefix}{rank}.png"
+        plt.imsave(filename, image, cmap = color_map, vmin = 0, vmax = 255, origin = 'lower')
+        print(f"Saved as \"{filename}\"")
+        ax = fig.add_subplot(rows, columns, rank)
+        ax.imshow(image, cmap = color_map, vmin = 0, vmax = 255, origin = 'lower')
+        ax.set_title(values, fontsize = text_size)
+        ax.axis("off")
+    plt.tight_layout()
+    plt.show()
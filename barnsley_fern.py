@@ -0,0 +1,63 @@
+# Barnsley fern and other iterated function systems
+# This code draws the fractal of an iterated function system of ifs_engine.py, such as the
+# Barnsley fern, the Sierpinski triangle or carpet or the Heighway dragon, in an image array
+# and shows it with matplotlib. The points are calculated with numpy either by random iteration
+# (the chaos game) or level by level from a starting square. The image can be saved as png file.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from ifs_engine import ifs_systems, random_iteration, level_points, rasterize
+
+# Parameters for calculation
+system = "barnsley_fern" # one of the systems in ifs_engine.py, or a tuple (list of maps, list of probabilities)
+method = "random" # "random": random iteration, "levels": the maps applied level by level to a square
+number_points = 2000000 # points of the random iteration
+depth = 12 # levels for method "levels", lowered if there would be more than max_shapes squares
+max_shapes = 10**6
+image_width = 700
+image_height = 1000
+x_range = (-2.75, 2.75) # fits the Barnsley fern, the other systems lie within (-1, 1.5) x (-0.5, 1.5)
+y_range = (-0.25, 10.25)
+# Parameters for viewing
+color_background = "#202020"
+color_map = "viridis" # the points are colored by the last map applied to them
+png_filename = "barnsley_fern.png"
+
+print("Iterated function system using Python, numpy and matplotlib")
+print("-----------------------------------------------------------")
+start_time = time.perf_counter()
+if method == "random":
+    x, y, map_index, end = random_iteration(system, number_points)
+else:
+    # the unit square (0, 0) - (1, 1), the maps of level depth are applied to it
+    pixel_size = (x_range[1] - x_range[0]) / image_width
+    x, y, map_index, depth = level_points(system, depth, (0, 1, 1, 0), (0, 0, 1, 1), pixel_size,
+                                         max_shapes = max_shapes, color_level = 0)
+    print(f"{depth} levels")
+image = rasterize(x, y, image_width, image_height, x_range, y_range, map_index + 1)
+print(f"{len(x)} points calculated and drawn in {time.perf_counter() - start_time:.2f} s")
+# the background gets the color_background, the maps the colors of color_map
+masked_image = np.ma.masked_equal(image, 0)
+number_maps = len(ifs_systems[system][0]) if isinstance(system, str) else len(system[0])
+
+# optionally save the image as a png image file
+answer = input(f"Save as \"{png_filename}\" image file? y/n ").lower()
+if answer == "y":
+    colors = plt.get_cmap(color_map)(np.linspace(0, 1, number_maps))
+    rgb = np.where(image[:, :, np.newaxis] > 0, colors[np.maximum(image, 1) - 1, :3],
+                   np.array(plt.matplotlib.colors.to_rgb(color_background)))
+    plt.imsave(png_filename, rgb)
+    print(f"Saved as \"{png_filename}\"")
+
+# show the image
+fig = plt.figure(figsize = (7, 10), num = "Iterated function system", facecolor = color_background)
+ax = fig.add_subplot(facecolor = color_background)
+ax.imshow(masked_image, cmap = color_map, vmin = 1, vmax = max(number_maps, 2),
+          extent = (*x_range, *y_range), interpolation = "nearest")
+ax.set_title(f"{system if isinstance(system, str) else 'IFS'}, {method}", color = "white")
+ax.axis("off")
+plt.tight_layout()
+plt.show()
@@ -0,0 +1,309 @@
+# Bifurcation engine
+# Shared numpy code which calculates bifurcation diagrams of one dimensional maps x_new = f(x, a),
+# such as the logistic map, used by logistic_map_calculate_image_v3.py and the other logistic map scripts.
+# Each column of the diagram has its own value of the parameter a, all columns are iterated at
+# once as a numpy array. The first burn_in iterations are not counted, the points then lie on the
+# attractor of each column and the transient does not smear the image. The kept points are
+# counted in an unsigned integer histogram (rows: x, columns: a) of the smallest type which can hold
+# all counts, for example np.uint16 instead of the 8 bytes per pixel of a float64 array.
+# In the same pass bifurcation_analysis() can calculate the Lyapunov exponent and the period of
+# the orbit of each column, to find the chaotic and periodic windows without looking at the image.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# the maps: name -> (function f(x, a), a range, x range, initial x), the functions use numpy
+# operations so they work on arrays, register_map() adds a map
+bifurcation_maps = {}
+
+def register_map(name, a_range, x_range, x_initial = 0.5):
+    def register(function):
+        bifurcation_maps[name] = (function, a_range, x_range, x_initial)
+        return function
+    return register
+
+@register_map("logistic", (3.5, 4.0), (0.0, 1.0))
+def logistic(x, a):
+    return a * x * (1.0 - x)
+
+@register_map("sine", (0.7, 1.0), (0.0, 1.0))
+def sine(x, a):
+    return a * np.sin(np.pi * x)
+
+@register_map("gauss", (-1.0, 1.0), (-1.0, 1.5), 0.0)
+def gauss(x, a):
+    return np.exp(-6.2 * x * x) + a
+
+@register_map("ricker", (1.5, 3.5), (0.0, 4.0), 0.5)
+def ricker(x, a):
+    return x * np.exp(a * (1.0 - x))
+
+# the derivatives df/dx of the maps for the Lyapunov exponent, register_derivative() adds one
+map_derivatives = {}
+
+def register_derivative(name):
+    def register(function):
+        map_derivatives[name] = function
+        return function
+    return register
+
+@register_derivative("logistic")
+def logistic_derivative(x, a):
+    return a * (1.0 - 2.0 * x)
+
+@register_derivative("sine")
+def sine_derivative(x, a):
+    return a * np.pi * np.cos(np.pi * x)
+
+@register_derivative("gauss")
+def gauss_derivative(x, a):
+    return -12.4 * x * np.exp(-6.2 * x * x)
+
+@register_derivative("ricker")
+def ricker_derivative(x, a):
+    return (1.0 - a * x) * np.exp(a * (1.0 - x))
+
+# the function of a map, system is the name of a registered map or a function f(x, a)
+def get_map(system):
+    return bifurcation_maps[system][0] if isinstance(system, str) else system
+
+# the derivative of a map, a central difference of the function if none is registered
+def get_derivative(system):
+    if isinstance(system, str) and system in map_derivatives:
+        return map_derivatives[system]
+    function = get_map(system)
+    step = 1e-7
+    return lambda x, a: (function(x + step, a) - function(x - step, a)) / (2 * step)
+
+# smallest unsigned integer type which can count up to maximum
+def count_dtype(maximum):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if maximum <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+# histogram of the bifurcation diagram: row 0 holds the lowest x of x_range, column i is a_values[i]
+# number_iterations: the counted iterations after burn_in iterations which are not counted
+# x_range: None uses the range of the registered map, points outside x_range are not counted
+# x_initial: a number or an array with a value for each column, None: initial x of the map
+# histogram: an existing histogram to add the counts to, for example with the x returned by a
+# previous call as x_initial and burn_in = 0 to continue the same orbits
+# dtype: None uses the smallest unsigned type which holds number_iterations counts
+# returns the histogram and the last x of each column
+def bifurcation_histogram(system, a_values, number_iterations, number_rows, x_range = None,
+                          burn_in = 1000, x_initial = None, histogram = None, dtype = None):
+    result = bifurcation_analysis(system, a_values, number_iterations, number_rows, x_range, burn_in,
+                                  x_initial, histogram, dtype, lyapunov = False, max_period = 0)
+    return result["histogram"], result["x"]
+
+# the histogram (if number_rows is not 0, see bifurcation_histogram()) and an analysis of each
+# column in the same pass over the iterations, returned as a dictionary with the arrays
+# "histogram": the histogram or None
+# "x": the last x of each column
+# "lyapunov": the Lyapunov exponent, the mean of log|df/dx| over the counted iterations, as float32,
+#     above 0 the orbit is chaotic, below 0 it is periodic, NaN if the orbit diverged
+# "period": the smallest period p <= max_period with |x[n] - x[n - p]| <= tolerance at the end of
+#     the counted iterations, 0 if there is none (chaotic, or not yet converged near a bifurcation)
+def bifurcation_analysis(system, a_values, number_iterations, number_rows = 0, x_range = None,
+                         burn_in = 1000, x_initial = None, histogram = None, dtype = None,
+                         lyapunov = True, max_period = 64, tolerance = 1e-9):
+    function = get_map(system)
+    derivative = get_derivative(system) if lyapunov else None
+    if x_range is None:
+        x_range = bifurcation_maps[system][2] if isinstance(system, str) else (0.0, 1.0)
+    if x_initial is None:
+        x_initial = bifurcation_maps[system][3] if isinstance(system, str) else 0.5
+    a = np.asarray(a_values, dtype = np.float64)
+    number_columns = len(a)
+    if histogram is None and number_rows > 0:
+        histogram = np.zeros((number_rows, number_columns),
+                             dtype = dtype or count_dtype(number_iterations))
+    x = np.array(np.broadcast_to(x_initial, number_columns), dtype = np.float64)
+    # the transient is iterated without counting
+    with np.errstate(over = "ignore", invalid = "ignore"):
+        for _ in range(burn_in):
+            x = function(x, a)
+    if histogram is not None:
+        x_low, x_high = x_range
+        scale = histogram.shape[0] / (x_high - x_low)
+        # index in the flattened histogram of row 0 of each column
+        column_index = np.arange(number_columns)
+        flat_histogram = histogram.reshape(-1)
+    log_derivative = np.zeros(number_columns)
+    max_period = min(max_period, number_iterations - 1)
+    period = np.zeros(number_columns, dtype = count_dtype(max(max_period, 1)))
+    with np.errstate(over = "ignore", invalid = "ignore", divide = "ignore"):
+        for counter in range(number_iterations):
+            if derivative is not None:
+                log_derivative += np.log(np.abs(derivative(x, a)))
+            x = function(x, a)
+            # the last max_period points are compared with the point just before them
+            steps_left = number_iterations - counter
+            if steps_left == max_period + 1:
+                x_first = x.copy()
+            elif steps_left <= max_period:
+                returned = (period == 0) & (np.abs(x - x_first) <= tolerance)
+                period[returned] = max_period + 1 - steps_left
+            if histogram is None:
+                continue
+            rows = np.floor((x - x_low) * scale)
+            inside = (rows >= 0) & (rows < histogram.shape[0])
+            if inside.all():
+                # each column has one point per iteration, so the indices are all different
+                # and a plain increment counts each of them once
+                flat_histogram[rows.astype(np.int64) * number_columns + column_index] += 1
+            else:
+                flat_histogram[rows[inside].astype(np.int64) * number_columns + column_index[inside]] += 1
+    result = {"histogram": histogram, "x": x, "period": period}
+    if derivative is not None:
+        result["lyapunov"] = np.where(np.isfinite(x), log_derivative / max(number_iterations, 1),
+                                      np.nan).astype(np.float32)
+    return result
+
+# the values of a at the given step numbers of a sweep from a_start to a_end in number_steps steps,
+# a is calculated when it is needed instead of being stored for every step of a long sweep
+def sweep_a(a_start, a_end, number_steps, steps):
+    return a_start + (a_end - a_start) * np.asarray(steps) / max(number_steps - 1, 1)
+
+# analysis of one orbit which sweeps slowly from a_start to a_end, x[i + 1] = f(x[i], a[i]) with a[i]
+# from sweep_a(), split in number_columns parts of equal length, returns a dictionary with one value per part:
+# "a": the mean a, "lyapunov" and "period" as in bifurcation_analysis(), the period is found over the
+# last max_period points of each part, the tolerance is larger because a changes along the orbit
+def sweep_analysis(system, a_start, a_end, x_values, number_columns, max_period = 64, tolerance = 1e-4,
+                   block_size = 2**22):
+    derivative = get_derivative(system)
+    length = len(x_values) // number_columns
+    max_period = min(max_period, length // 2)
+    a_mean = np.zeros(number_columns)
+    lyapunov = np.zeros(number_columns, dtype = np.float32)
+    period = np.zeros(number_columns, dtype = count_dtype(max(max_period, 1)))
+    # the columns are analysed in blocks of about block_size points, so long sweeps of float32
+    # values are not converted to float64 all at once and a is only calculated for one block
+    block_columns = max(1, block_size // max(length, 1))
+    for first in range(0, number_columns, block_columns):
+        last = min(first + block_columns, number_columns)
+        a = sweep_a(a_start, a_end, len(x_values), np.arange(first * length, last * length)).reshape(last - first, length)
+        x = np.asarray(x_values[first * length:last * length], dtype = np.float64).reshape(last - first, length)
+        with np.errstate(over = "ignore", invalid = "ignore", divide = "ignore"):
+            a_mean[first:last] = a.mean(axis = 1)
+            lyapunov[first:last] = np.log(np.abs(derivative(x, a))).mean(axis = 1)
+            block_period = period[first:last]
+            end = x[:, length - max_period:]
+            for p in range(1, max_period + 1):
+                returned = (block_period == 0) & np.all(np.abs(end - x[:, length - max_period - p:length - p])
+                                                         <= tolerance, axis = 1)
+                block_period[returned] = p
+    return {"a": a_mean, "lyapunov": lyapunov, "period": period}
+
+# **** chunked sweep ***************
+
+# A single orbit which sweeps through a has to be calculated one step after the other. For long
+# sweeps the range of a is split in chunks instead, each chunk starts from x_initial and first
+# iterates burn_in steps at its first value of a, so it continues close to where the single orbit
+# would be. All chunks are then iterated at the same time as a numpy array, one step of each chunk
+# per iteration. The x values are written in a preallocated float32 array, 4 bytes per step.
+
+# iterate the chunks first_chunk up to first_chunk + number_chunks and write them in out,
+# x[i + 1] = f(x[i], a[i]) as for a single orbit, only the last chunk of the sweep can be shorter
+def _sweep_chunks(system, a_start, a_end, number_steps, first_chunk, number_chunks, chunk_length,
+                  burn_in, x_initial, out):
+    function = get_map(system)
+    starts = (first_chunk + np.arange(number_chunks)) * chunk_length
+    # the chunks of full length are the rows of a 2D view of out
+    number_full = np.count_nonzero(starts + chunk_length <= number_steps)
+    full = out[starts[0]:starts[0] + number_full * chunk_length].reshape(number_full, chunk_length)
+    tail_start = starts[-1]
+    tail_length = number_steps - tail_start if number_full < number_chunks else 0
+    with np.errstate(over = "ignore", invalid = "ignore"):
+        # warm start of each chunk at its first value of a
+        x = np.full(number_chunks, x_initial, dtype = np.float64)
+        a = sweep_a(a_start, a_end, number_steps, starts)
+        for _ in range(burn_in):
+            x = function(x, a)
+        for step in range(chunk_length):
+            full[:, step] = x[:number_full]
+            if step < tail_length:
+                out[tail_start + step] = x[-1]
+            x = function(x, sweep_a(a_start, a_end, number_steps, starts + step))
+
+# the sweep in shared memory as seen by a worker process, set by _attach_shared_sweep()
+_shared_sweep = None
+
+def _attach_shared_sweep(shared_memory_name, number_steps):
+    global _shared_sweep, _shared_memory
+    _shared_memory = shared_memory.SharedMemory(name = shared_memory_name)
+    _shared_sweep = np.ndarray(number_steps, dtype = np.float32, buffer = _shared_memory.buf)
+
+# keeps shared memory open as long as an array uses it: np.asarray() of it gives an array in the
+# shared memory with this object as base, the memory is closed when that array and all its views
+# are no longer used
+class _SharedBlock:
+    def __init__(self, block, shape, dtype):
+        self.block = block
+        self.array = np.ndarray(shape, dtype = dtype, buffer = block.buf)
+        self.__array_interface__ = self.array.__array_interface__
+
+    def __del__(self):
+        del self.array
+        self.block.close()
+
+def _sweep_part(system, a_start, a_end, number_steps, first_chunk, number_chunks, chunk_length,
+                burn_in, x_initial):
+    _sweep_chunks(system, a_start, a_end, number_steps, first_chunk, number_chunks, chunk_length,
+                  burn_in, x_initial, _shared_sweep)
+
+# the x values of a sweep from a_start to a_end in number_steps steps, calculated in number_chunks
+# chunks, returns a float32 array, out: a preallocated float32 array of number_steps values
+# number_processes: None uses all cores, 1 calculates all chunks in the current process,
+# the system then has to be a name or a function defined at module level
+# with several processes the returned array is the shared memory the processes wrote in, so the
+# sweep is not copied, leave out None then, a given out array costs an extra copy
+def sweep_orbit(system, a_start, a_end, number_steps, number_chunks = 1000, burn_in = 200,
+                x_initial = None, out = None, number_processes = 1):
+    if x_initial is None:
+        x_initial = bifurcation_maps[system][3] if isinstance(system, str) else 0.5
+    chunk_length = -(-number_steps // max(1, min(number_chunks, number_steps)))
+    number_chunks = -(-number_steps // chunk_length)
+    if number_processes is None:
+        number_processes = os.cpu_count() or 1
+    if number_processes == 1:
+        if out is None:
+            out = np.empty(number_steps, dtype = np.float32)
+        _sweep_chunks(system, a_start, a_end, number_steps, 0, number_chunks, chunk_length,
+                      burn_in, x_initial, out)
+        return out
+    # each process calculates a few parts of consecutive chunks in the shared memory
+    number_parts = min(number_chunks, 4 * number_processes)
+    bounds = np.linspace(0, number_chunks, number_parts + 1).astype(int)
+    sweep_memory = shared_memory.SharedMemory(create = True, size = max(1, 4 * number_steps))
+    try:
+        sweep = np.asarray(_SharedBlock(sweep_memory, number_steps, np.float32))
+        with ProcessPoolExecutor(max_workers = number_processes,
+                                 initializer = _attach_shared_sweep,
+                                 initargs = (sweep_memory.name, number_steps)) as executor:
+            futures = [executor.submit(_sweep_part, system, a_start, a_end, number_steps, first,
+                                       last - first, chunk_length, burn_in, x_initial)
+                       for first, last in zip(bounds[:-1], bounds[1:]) if last > first]
+            for future in futures:
+                future.result() # raises any exception from the worker process
+    finally:
+        # only the name is removed, the memory stays until sweep is no longer used
+        sweep_memory.unlink()
+    if out is None:
+        return sweep
+    out[:] = sweep
+    return out
+
+# the histogram as np.uint8 grey values with the highest x in the top row, counts of vmaximum and
+# more are white, a lookup table converts it without a float copy of the histogram, the table
+# only goes up to the first count which is white so its size does not depend on the largest count
+def histogram_image(histogram, vmaximum):
+    limit = min(int(histogram.max()), max(0, math.ceil(vmaximum)))
+    lookup = np.clip(np.arange(limit + 1) * (255 / vmaximum), 0, 255).astype(np.uint8)
+    return lookup[np.minimum(histogram[::-1], limit)]
@@ -0,0 +1,231 @@
+# Bifurcation diagram explorer
+# Interactive viewer on top of bifurcation_engine.py, it uses numpy and matplotlib.
+# Zoom in and out with the mouse wheel around the mouse pointer (hold shift to zoom only in the
+# direction of a), pan by dragging with the left mouse button, + and - double or halve the number
+# of iterations. Only the visible range of a is calculated, with one column per screen pixel.
+# The values of a lie on a fixed grid for each zoom level, a grid with twice as many columns
+# contains all columns of the coarser grid. The visible range of x is widened to a fixed grid too.
+# The columns are calculated by a worker thread so the window stays responsive, and their
+# histograms are kept in a cache with (a, x window, iterations) as key: panning back or zooming out
+# to an earlier view reuses them, and zooming in only calculates the columns which are new.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import math
+import queue
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib.pyplot as plt
+from bifurcation_engine import bifurcation_maps, bifurcation_histogram
+
+# Parameters for calculation
+map_name = "logistic" # one of the maps in bifurcation_engine.py
+number_iterations = 1000 # counted iterations for each column
+burn_in = 1000 # iterations before counting, the transient is not shown
+# initial view, the ranges of the map
+a_low, a_high = bifurcation_maps[map_name][1]
+x_low, x_high = bifurcation_maps[map_name][2]
+base_column_width = 4.0 # width in a of a column at zoom level 0
+base_window_height = 4.0 # height in x of a part of the x window at zoom level 0
+window_rows = 256 # rows of each part of the x window
+cache_size = 50000 # maximum number of column histograms kept in the cache
+columns_per_batch = 128 # columns calculated together by the worker
+zoom_factor = 1.5 # zoom for each step of the mouse wheel
+# Parameters for viewing
+color_background = "#202020"
+color_map = "gray" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_spectral"
+brightness = 7.0 # counts of brightness times the average count are white
+text_size = 12
+redraw_interval = 100 # milliseconds between checks for newly calculated columns
+
+# **** column cache ***************
+
+# least recently used columns are removed first when the cache is full
+column_cache = OrderedDict()
+cache_lock = threading.Lock()
+
+def cache_get(key):
+    with cache_lock:
+        column = column_cache.get(key)
+        if column is not None:
+            column_cache.move_to_end(key)
+        return column
+
+def cache_put(key, column):
+    with cache_lock:
+        column_cache[key] = column
+        column_cache.move_to_end(key)
+        while len(column_cache) > cache_size:
+            column_cache.popitem(last = False)
+
+# a window is (lowest x, highest x, number of rows), together with a and the settings
+# (iterations, burn-in, map name) this defines a column histogram
+def current_settings():
+    return (number_iterations, burn_in, map_name)
+
+def column_key(a, window, settings):
+    return (a, window, *settings)
+
+# **** column calculation ***************
+
+def calc_columns(a_values, window, settings):
+    iterations, burn_in_iterations, name = settings
+    histogram, x = bifurcation_histogram(name, a_values, iterations, window[2],
+                                         x_range = window[:2], burn_in = burn_in_iterations)
+    return histogram
+
+# **** worker thread ***************
+
+# the worker calculates the columns of the latest requested view, columns of older views are skipped,
+# the settings are those of the request so a change during a batch cannot mix up the cache keys
+request_queue = queue.Queue()
+view_generation = 0
+new_columns = threading.Event()
+
+def worker():
+    while True:
+        generation, window, settings, a_values = request_queue.get()
+        for start in range(0, len(a_values), columns_per_batch):
+            if generation != view_generation:
+                break # the view changed, stop calculating columns for the old view
+            batch = a_values[start:start + columns_per_batch]
+            histogram = calc_columns(batch, window, settings)
+            for a, column in zip(batch, histogram.T):
+                cache_put(column_key(a, window, settings), column.copy())
+            new_columns.set()
+
+threading.Thread(target = worker, daemon = True).start()
+
+# **** view ***************
+
+# the values of a on the grid of the zoom level at which a column is not wider than a screen pixel,
+# and the x window widened to the grid at which a row is not higher than a screen pixel
+def visible_grid():
+    axes_width = max(1, ax.bbox.width)
+    axes_height = max(1, ax.bbox.height)
+    level = max(0, math.ceil(math.log2(base_column_width * axes_width / (a_high - a_low))))
+    column_width = base_column_width / 2**level
+    a_values = np.arange(math.floor(a_low / column_width),
+                         math.floor(a_high / column_width) + 1) * column_width
+    window_level = max(0, math.ceil(math.log2(base_window_height * axes_height
+                                              / (window_rows * (x_high - x_low)))))
+    window_height = base_window_height / 2**window_level
+    first = math.floor(x_low / window_height)
+    last = math.floor(x_high / window_height) + 1
+    window = (first * window_height, last * window_height, (last - first) * window_rows)
+    return a_values, window
+
+# build the image from the cached columns and send the missing columns to the worker
+def update_view(request_missing = True):
+    global view_generation
+    a_values, window = visible_grid()
+    settings = current_settings()
+    mosaic = np.zeros((window[2], len(a_values)), dtype = np.float32)
+    missing = []
+    for index, a in enumerate(a_values):
+        column = cache_get(column_key(a, window, settings))
+        if column is None:
+            missing.append(a)
+        else:
+            mosaic[:, index] = column
+    column_width = a_values[1] - a_values[0] if len(a_values) > 1 else 1.0
+    image.set_data(mosaic)
+    image.set_extent((a_values[0] - column_width / 2, a_values[-1] + column_width / 2,
+                      window[0], window[1]))
+    average = mosaic.mean()
+    image.set_clim(0, brightness * average if average > 0 else 1)
+    ax.set_xlim(a_low, a_high)
+    ax.set_ylim(x_low, x_high)
+    ax.set_title(f"{map_name} map, a {a_low:.10g} to {a_high:.10g}, {number_iterations} iterations, "
+                 f"{len(missing)} columns to calculate, {len(column_cache)} in cache", fontsize = text_size)
+    if missing and request_missing:
+        # calculate the columns closest to the center of the view first
+        center = (a_low + a_high) / 2
+        missing.sort(key = lambda a: abs(a - center))
+        view_generation += 1
+        request_queue.put((view_generation, window, settings, np.array(missing)))
+    fig.canvas.draw_idle()
+
+# redraw when the worker has calculated new columns, called by a timer in the GUI thread
+def check_new_columns():
+    if new_columns.is_set():
+        new_columns.clear()
+        update_view(request_missing = False)
+
+# **** mouse and keyboard events ***************
+
+drag_start = None
+
+def toolbar_active():
+    toolbar = fig.canvas.toolbar
+    return toolbar is not None and toolbar.mode != ""
+
+def on_scroll(event):
+    global a_low, a_high, x_low, x_high
+    if event.inaxes is not ax or toolbar_active():
+        return
+    factor = 1 / zoom_factor if event.button == "up" else zoom_factor
+    # zoom around the mouse pointer, the point under the pointer stays in place
+    a_low = event.xdata + (a_low - event.xdata) * factor
+    a_high = event.xdata + (a_high - event.xdata) * factor
+    if event.key != "shift":
+        x_low = event.ydata + (x_low - event.ydata) * factor
+        x_high = event.ydata + (x_high - event.ydata) * factor
+    update_view()
+
+def on_press(event):
+    global drag_start
+    if event.inaxes is ax and event.button == 1 and not toolbar_active():
+        drag_start = (event.x, event.y, a_low, a_high, x_low, x_high)
+
+def on_motion(event):
+    global a_low, a_high, x_low, x_high
+    if drag_start is None:
+        return
+    start_x, start_y, start_a_low, start_a_high, start_x_low, start_x_high = drag_start
+    # the view moves with the mouse pointer, measured in screen pixels
+    a_shift = (event.x - start_x) * (start_a_high - start_a_low) / ax.bbox.width
+    x_shift = (event.y - start_y) * (start_x_high - start_x_low) / ax.bbox.height
+    a_low, a_high = start_a_low - a_shift, start_a_high - a_shift
+    x_low, x_high = start_x_low - x_shift, start_x_high - x_shift
+    update_view()
+
+def on_release(event):
+    global drag_start
+    drag_start = None
+
+def on_key(event):
+    global number_iterations
+    if event.key == "+":
+        number_iterations *= 2
+    elif event.key == "-" and number_iterations > 1:
+        number_iterations //= 2
+    else:
+        return
+    update_view()
+
+# **** window ***************
+
+fig = plt.figure(figsize = (12, 9), num = "Bifurcation explorer", facecolor = color_background)
+plt.style.use('dark_background')
+ax = fig.add_axes((0.05, 0.05, 0.9, 0.88))
+image = ax.imshow(np.zeros((window_rows, window_rows), dtype = np.float32),
+                  cmap = color_map, origin = 'lower', interpolation = "nearest", aspect = "auto")
+ax.set_xlabel("a", fontsize = text_size)
+ax.set_ylabel("x", fontsize = text_size)
+ax.tick_params(labelsize = text_size - 2)
+fig.canvas.mpl_connect("scroll_event", on_scroll)
+fig.canvas.mpl_connect("button_press_event", on_press)
+fig.canvas.mpl_connect("motion_notify_event", on_motion)
+fig.canvas.mpl_connect("button_release_event", on_release)
+fig.canvas.mpl_connect("key_press_event", on_key)
+timer = fig.canvas.new_timer(interval = redraw_interval)
+timer.add_callback(check_new_columns)
+timer.start()
+
+print("Bifurcation explorer: mouse wheel to zoom (shift: only a), drag with the left mouse button to pan, "
+      "+ and - to change the number of iterations")
+update_view()
+plt.show()
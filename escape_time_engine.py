@@ -0,0 +1,473 @@
+# Escape time engine
+# Shared numpy code to calculate escape time fractals such as the Mandelbrot and Julia sets,
+# used by mandelbrot_v1.py, mandelbrot_v1_detail.py, julia_v1.py, mandelbrot_pil_image.py
+# and julia_pil_image.py
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+#
+# Only the pixels which did not yet exceed the threshold are iterated. Their z and c values
+# are kept in compacted 1D arrays together with an index into the flattened image. Each time
+# some pixels escape, their counter value is written into the image through that index and
+# they are dropped from the compacted arrays. The work done per iteration is therefore
+# proportional to the number of pixels still active, not to the size of the full image.
+
+import os
+import struct
+import zlib
+from decimal import Decimal, localcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# choose the smallest unsigned integer type which can hold all counter values,
+# these go from 0 up to number_iterations - 1
+def escape_dtype(number_iterations):
+    if number_iterations - 1 <= np.iinfo(np.uint8).max:
+        return np.uint8
+    if number_iterations - 1 <= np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.uint32
+
+# test which values of c lie in the main cardioid or in the period 2 bulb of the Mandelbrot set,
+# z never escapes for these values so they don't have to be iterated
+def in_cardioid_or_bulb(cr, ci):
+    ci2 = ci * ci
+    q = (cr - 0.25) ** 2 + ci2
+    in_cardioid = q * (q + (cr - 0.25)) <= 0.25 * ci2
+    in_bulb = (cr + 1.0) ** 2 + ci2 <= 0.0625
+    return in_cardioid | in_bulb
+
+# iterate z -> z**2 + c on the active elements only
+# z_array: initial values for z, for the Mandelbrot set all zeros
+# c_array: values for c, for a Julia set a single complex constant can be given
+# inclusive: an element escapes when |z| >= z_threshold if True, when |z| > z_threshold if False
+# cardioid_check: skip the values of c in the main cardioid and period 2 bulb,
+# only valid for the Mandelbrot set where z starts at 0
+# periodicity_check: stop iterating elements of which the orbit repeats itself exactly (Brent's
+# method: z is compared with a saved value which is renewed after 1, 2, 4, 8, ... iterations),
+# in floating point such an orbit will cycle forever and never escape
+# after each iteration this generator yields (counter, index_escaped, norm_escaped, number_active):
+# index_escaped contains the indices into the flattened image of the elements which escaped
+# in this iteration, norm_escaped their values of |z|**2, number_active is the number of
+# elements which are still iterated
+# elements removed by the cardioid and periodicity checks are never yielded, as the interior
+def _escape_iterations(z_array, c_array, number_iterations, z_threshold, inclusive,
+                       cardioid_check = False, periodicity_check = False):
+    shape = np.broadcast_shapes(np.shape(z_array), np.shape(c_array))
+    # flattened copies of the real and imaginary parts of z, these are iterated in place
+    z_flat = np.broadcast_to(z_array, shape).ravel()
+    zr = np.array(z_flat.real, dtype = np.float64)
+    zi = np.array(z_flat.imag, dtype = np.float64)
+    if np.ndim(c_array) == 0:
+        # a constant c (Julia set) does not need an array of it's own
+        cr, ci = complex(c_array).real, complex(c_array).imag
+    else:
+        c_flat = np.broadcast_to(c_array, shape).ravel()
+        cr = np.array(c_flat.real, dtype = np.float64)
+        ci = np.array(c_flat.imag, dtype = np.float64)
+    # index of each active element into the flattened image
+    index_active = np.arange(zr.size)
+    if cardioid_check and np.ndim(cr) != 0:
+        still_active = ~in_cardioid_or_bulb(cr, ci)
+        zr, zi, cr, ci = zr[still_active], zi[still_active], cr[still_active], ci[still_active]
+        index_active = index_active[still_active]
+    threshold_squared = z_threshold * z_threshold
+    compare = np.greater_equal if inclusive else np.greater
+    # |z|**2 is a few rounding errors away from abs(z)**2, so every element with abs(z) at or
+    # above the threshold has |z|**2 above this lower bound
+    candidate_squared = threshold_squared * (1 - 8 * np.finfo(np.float64).eps)
+    # squares of the real and imaginary parts, also used for |z|**2
+    zr2 = zr * zr
+    zi2 = zi * zi
+    if periodicity_check:
+        saved_r, saved_i = zr.copy(), zi.copy()
+        next_save = 1
+    for counter in range(number_iterations):
+        # z = z**2 + c on the active elements only, with the real and imaginary parts
+        # calculated in the same order as CPython multiplies complex numbers
+        zi *= zr
+        zi += zi
+        zi += ci
+        np.subtract(zr2, zi2, out = zr)
+        zr += cr
+        np.multiply(zr, zr, out = zr2)
+        np.multiply(zi, zi, out = zi2)
+        # |z|**2 avoids the square root of abs()
+        norm = zr2 + zi2
+        # the few candidates are compared as abs(z) of the CPython scripts with np.hypot, near the
+        # threshold |z|**2 alone can round to the other side
+        escaped = norm >= candidate_squared
+        candidates = np.flatnonzero(escaped)
+        if candidates.size:
+            escaped[candidates] = compare(np.hypot(zr[candidates], zi[candidates]), z_threshold)
+        index_escaped = index_active[escaped]
+        norm_escaped = norm[escaped]
+        if periodicity_check:
+            # elements back at their saved value are removed without being reported as escaped
+            remove = escaped | ((zr == saved_r) & (zi == saved_i))
+        else:
+            remove = escaped
+        if remove.any():
+            # compact the active arrays, keeping only the elements which are still iterated
+            still_active = ~remove
+            zr, zi = zr[still_active], zi[still_active]
+            zr2, zi2 = zr2[still_active], zi2[still_active]
+            index_active = index_active[still_active]
+            if np.ndim(cr) != 0:
+                cr, ci = cr[still_active], ci[still_active]
+            if periodicity_check:
+                saved_r, saved_i = saved_r[still_active], saved_i[still_active]
+        if periodicity_check and counter + 1 == next_save:
+            saved_r[:], saved_i[:] = zr, zi
+            next_save *= 2
+        yield counter, index_escaped, norm_escaped, zr.size
+        if zr.size == 0:
+            break
+
+# calculate the escape time image for z -> z**2 + c
+# the returned array contains for each pixel the iteration at which |z| exceeded z_threshold,
+# pixels which never exceed the threshold stay 0. As in the original scripts pixels which
+# escape in the very first iteration get the value 1 so they are not mistaken for the interior
+# the integer type of the counts is chosen by escape_dtype(), or can be set with dtype,
+# for instance np.uint16 to avoid wrapping around at 255 with np.uint8
+# smooth: return continuous iteration counts as float32 instead, without color bands:
+#   n + 1 - log2(log|z| / log(z_threshold))
+# with n the iteration at which |z| exceeded z_threshold, calculated in the same pass
+def escape_time(z_array, c_array, number_iterations, z_threshold = 2.0,
+                dtype = None, feedback_step = 10, cardioid_check = False, periodicity_check = False,
+                smooth = False):
+    shape = np.broadcast_shapes(np.shape(z_array), np.shape(c_array))
+    if dtype is None:
+        dtype = np.float32 if smooth else escape_dtype(number_iterations)
+    log_threshold_squared = np.log(z_threshold * z_threshold)
+    escape_array = np.zeros(shape, dtype = dtype).ravel()
+    for counter, index_escaped, norm_escaped, number_active in _escape_iterations(
+            z_array, c_array, number_iterations, z_threshold, inclusive = True,
+            cardioid_check = cardioid_check, periodicity_check = periodicity_check):
+        # scatter the counter value into the image for the escaped elements
+        if smooth:
+            # log|z| / log(z_threshold) = log(|z|**2) / log(z_threshold**2)
+            escape_array[index_escaped] = counter + 1 - np.log2(np.log(norm_escaped) / log_threshold_squared)
+        else:
+            escape_array[index_escaped] = max(counter, 1)
+        if feedback_step and counter % feedback_step == 0:
+            print(f"Iteration {counter} of {number_iterations} completed, "
+                  f"{number_active} active pixels\r", end = "")
+    if feedback_step:
+        print()
+    return escape_array.reshape(shape)
+
+# calculate the image of iteration indices as the pure Python loops
+#   for i in range(number_iterations): z = z**2 + c; if abs(z) > z_threshold: break
+# do: each pixel gets the index i of the iteration in which |z| > z_threshold,
+# pixels which never exceed the threshold get number_iterations - 1
+def escape_index(z_array, c_array, number_iterations, z_threshold = 2.0, dtype = None,
+                 cardioid_check = False, periodicity_check = False):
+    shape = np.broadcast_shapes(np.shape(z_array), np.shape(c_array))
+    if dtype is None:
+        dtype = escape_dtype(number_iterations)
+    index_array = np.full(shape, number_iterations - 1, dtype = dtype).ravel()
+    for counter, index_escaped, norm_escaped, number_active in _escape_iterations(
+            z_array, c_array, number_iterations, z_threshold, inclusive = False,
+            cardioid_check = cardioid_check, periodicity_check = periodicity_check):
+        index_array[index_escaped] = counter
+    return index_array.reshape(shape)
+
+# **** deep zoom using perturbation theory ***************
+#
+# Below a view width of about 1e-13 the float64 values of c of neighbouring pixels are no
+# longer distinct. In deep zoom mode only one point, the center of the view, is iterated with
+# high precision using the decimal module, this is the reference orbit Z. Each pixel at
+# c = C + dc only iterates its small difference dz with that reference orbit in float64:
+#   dz -> 2 * Z * dz + dz**2 + dc     and the full value is   z = Z + dz
+# Where z comes close to 0 the difference dz becomes larger than z itself and loses precision
+# (a glitch). Such pixels, and pixels which reach the end of the reference orbit because the
+# reference escaped, are rebased: they continue with dz = z from the start of the reference
+# orbit (Z = 0). So one reference orbit is enough for the whole image.
+# The float64 differences limit the zoom to view widths of about 1e-150.
+
+# calculate the reference orbit of the point center_re + j * center_im with the given number
+# of significant digits, the strings center_re and center_im can contain any number of digits
+# the orbit starts with Z = 0 and ends after number_iterations or when |Z| exceeds z_threshold,
+# it is returned as float64 complex values
+def reference_orbit(center_re, center_im, number_iterations, digits, z_threshold = 2.0):
+    with localcontext() as context:
+        context.prec = digits
+        cr, ci = Decimal(center_re), Decimal(center_im)
+        zr, zi = Decimal(0), Decimal(0)
+        threshold_squared = Decimal(z_threshold) ** 2
+        orbit = [0j]
+        for counter in range(number_iterations):
+            zr, zi = zr * zr - zi * zi + cr, 2 * zr * zi + ci
+            orbit.append(complex(float(zr), float(zi)))
+            if zr * zr + zi * zi > threshold_squared:
+                break
+    return np.array(orbit)
+
+# calculate the escape time image of the Mandelbrot set for a view of x_width by y_width
+# centered on center_re + j * center_im, the values are as returned by escape_time()
+def deep_zoom_escape_time(center_re, center_im, x_width, y_width, image_width, image_height,
+                          number_iterations, z_threshold = 2.0, dtype = None, feedback_step = 10):
+    if dtype is None:
+        dtype = escape_dtype(number_iterations)
+    x_step = x_width / (image_width - 1)
+    y_step = y_width / (image_height - 1)
+    # enough digits to resolve the pixels, with a margin for the loss of precision while iterating
+    digits = int(-np.log10(min(x_step, y_step))) + 20
+    orbit = reference_orbit(center_re, center_im, number_iterations, digits, z_threshold)
+    last_reference = len(orbit) - 1
+    print(f"Reference orbit of {last_reference} iterations calculated with {digits} digits")
+    # difference dc of each pixel with the center of the view, flattened
+    dx = (np.arange(image_width) - (image_width - 1) / 2) * x_step
+    dy = (np.arange(image_height) - (image_height - 1) / 2) * y_step
+    dc_active = (dx[np.newaxis, :] + 1j * dy[:, np.newaxis]).ravel()
+    dz_active = np.zeros(dc_active.size, dtype = np.complex128)
+    # position of each pixel in the reference orbit
+    m_active = np.zeros(dc_active.size, dtype = np.intp)
+    # index of each active element into the flattened image
+    index_active = np.arange(dc_active.size)
+    escape_array = np.zeros(dc_active.size, dtype = dtype)
+    threshold_squared = z_threshold * z_threshold
+    number_rebased = 0
+    for counter in range(number_iterations):
+        # dz = 2 * Z * dz + dz**2 + dc  =  (2 * Z + dz) * dz + dc
+        dz_active = (2 * orbit[m_active] + dz_active) * dz_active + dc_active
+        m_active += 1
+        z = orbit[m_active] + dz_active
+        z_norm = z.real * z.real + z.imag * z.imag
+        escaped = z_norm >= threshold_squared
+        # rebase glitched pixels and pixels at the end of the reference orbit
+        rebase = (z_norm < dz_active.real * dz_active.real + dz_active.imag * dz_active.imag)
+        rebase |= m_active == last_reference
+        rebase &= ~escaped
+        if rebase.any():
+            dz_active[rebase] = z[rebase]
+            m_active[rebase] = 0
+            number_rebased += np.count_nonzero(rebase)
+        if escaped.any():
+            # scatter the counter value into the image for the escaped elements
+            escape_array[index_active[escaped]] = max(counter, 1)
+            # compact the active arrays, keeping only the elements which did not escape
+            still_active = ~escaped
+            dz_active = dz_active[still_active]
+            dc_active = dc_active[still_active]
+            m_active = m_active[still_active]
+            index_active = index_active[still_active]
+            if index_active.size == 0:
+                break
+        if feedback_step and counter % feedback_step == 0:
+            print(f"Iteration {counter} of {number_iterations} completed, "
+                  f"{index_active.size} active pixels, {number_rebased} rebased\r", end = "")
+    if feedback_step:
+        print()
+    return escape_array.reshape(image_height, image_width)
+
+# **** tiled rendering on several processes ***************
+#
+# The image is split in tiles, each tile is calculated by a separate process from a
+# ProcessPoolExecutor. The processes write their tile directly into one shared memory block
+# which holds the image, so no image data has to be sent back.
+# Each pixel uses the same x and y values and the same calculation as in a single process,
+# the result is identical to calculating the complete image at once.
+# For very large images render_strips() calculates the image in horizontal bands, the shared
+# memory block only holds one band and is reused for all bands, so the memory needed is set by
+# the band height and not by the height of the image.
+# Scripts which use this have to protect their main code with  if __name__ == "__main__":
+# because on some platforms the worker processes import the main script
+
+# the band in shared memory as seen by a worker process, set by _attach_shared_image()
+_shared_image = None
+
+def _attach_shared_image(shared_memory_name, shape, dtype):
+    global _shared_image, _shared_memory
+    _shared_memory = shared_memory.SharedMemory(name = shared_memory_name)
+    _shared_image = np.ndarray(shape, dtype = dtype, buffer = _shared_memory.buf)
+
+def _render_tile(tile_function, row_slice, column_slice, x_tile, y_tile):
+    _shared_image[row_slice, column_slice] = tile_function(x_tile, y_tile)
+
+# split the image in tiles of tile_size x tile_size pixels, returns a list of (row, column) slices
+def image_tiles(image_height, image_width, tile_size = 256):
+    return [(slice(row, min(row + tile_size, image_height)),
+             slice(column, min(column + tile_size, image_width)))
+            for row in range(0, image_height, tile_size)
+            for column in range(0, image_width, tile_size)]
+
+# calculate an image in horizontal bands of band_height rows, each band tile by tile
+# tile_function(x_tile, y_tile) returns the tile as array of shape (len(y_tile), len(x_tile)),
+# it has to be defined at module level (or be a functools.partial of such a function)
+# so it can be sent to the worker processes
+# x_values, y_values: the x and y coordinates of the columns and rows of the complete image
+# number_processes: None uses all cores, 1 calculates all tiles in the current process
+# monitor: a ProgressMonitor (see progress_monitor.py), the pixels of each tile are added to it
+# this generator yields (row, band) for each band, with row the index of the first row of the band
+def render_strips(tile_function, x_values, y_values, dtype, band_height = 256,
+                  tile_size = 256, number_processes = None, feedback = True, monitor = None):
+    image_height, image_width = len(y_values), len(x_values)
+    band_height = max(1, min(band_height, image_height))
+    band_shape = (band_height, image_width)
+    number_tiles = sum(len(image_tiles(min(band_height, image_height - row), image_width, tile_size))
+                       for row in range(0, image_height, band_height))
+    tiles_completed = 0
+    if number_processes is None:
+        number_processes = os.cpu_count() or 1
+    if number_processes == 1:
+        for row in range(0, image_height, band_height):
+            y_band = y_values[row:row + band_height]
+            band = np.zeros((len(y_band), image_width), dtype = dtype)
+            for row_slice, column_slice in image_tiles(len(y_band), image_width, tile_size):
+                band[row_slice, column_slice] = tile_function(x_values[column_slice], y_band[row_slice])
+                tiles_completed += 1
+                if monitor is not None:
+                    monitor.update((row_slice.stop - row_slice.start) * (column_slice.stop - column_slice.start))
+                if feedback:
+                    print(f"Tile {tiles_completed} of {number_tiles} completed\r", end = "")
+            yield row, band
+        if feedback:
+            print()
+        return
+    band_bytes = max(1, band_height * image_width * np.dtype(dtype).itemsize)
+    band_memory = shared_memory.SharedMemory(create = True, size = band_bytes)
+    try:
+        shared_band = np.ndarray(band_shape, dtype = dtype, buffer = band_memory.buf)
+        with ProcessPoolExecutor(max_workers = number_processes,
+                                 initializer = _attach_shared_image,
+                                 initargs = (band_memory.name, band_shape, dtype)) as executor:
+            for row in range(0, image_height, band_height):
+                y_band = y_values[row:row + band_height]
+                futures = {executor.submit(_render_tile, tile_function, row_slice, column_slice,
+                                           x_values[column_slice], y_band[row_slice]):
+                           (row_slice.stop - row_slice.start) * (column_slice.stop - column_slice.start)
+                           for row_slice, column_slice in image_tiles(len(y_band), image_width, tile_size)}
+                for future in as_completed(futures):
+                    future.result() # raises any exception from the worker process
+                    tiles_completed += 1
+                    if monitor is not None:
+                        monitor.update(futures[future])
+                    if feedback:
+                        print(f"Tile {tiles_completed} of {number_tiles} completed "
+                              f"on {number_processes} processes\r", end = "")
+                # copy the band out of the shared memory before it is reused
+                yield row, shared_band[:len(y_band)].copy()
+        if feedback:
+            print()
+    finally:
+        band_memory.close()
+        band_memory.unlink()
+
+# calculate the complete image tile by tile, see render_strips()
+def render_tiled(tile_function, x_values, y_values, dtype,
+                 tile_size = 256, number_processes = None, feedback = True, monitor = None):
+    for row, image in render_strips(tile_function, x_values, y_values, dtype,
+                                    band_height = len(y_values), tile_size = tile_size,
+                                    number_processes = number_processes, feedback = feedback,
+                                    monitor = monitor):
+        return image
+
+# **** writing large images to disk band by band ***************
+
+# write the bands from render_strips() into a .npy file as they arrive, the file can be opened
+# later with np.load(filename, mmap_mode = "r") without reading it completely into memory
+def write_strips_npy(filename, strips, image_height, image_width, dtype):
+    with open(filename, "wb") as file:
+        np.lib.format.write_array_header_1_0(file, {
+            "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+            "fortran_order": False,
+            "shape": (image_height, image_width)})
+        for row, band in strips:
+            file.write(np.ascontiguousarray(band, dtype = dtype).tobytes())
+
+# writes an RGB PNG file band by band, the rows are compressed as they are added
+class PngStripWriter:
+
+    def __init__(self, filename, image_width, image_height, compression_level = 6):
+        self.image_width = image_width
+        self.image_height = image_height
+        self.rows_written = 0
+        self.file = open(filename, "wb")
+        self.compressor = zlib.compressobj(compression_level)
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        # width, height, 8 bits per channel, color type 2 (RGB), default compression,
+        # filter method and no interlacing
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", image_width, image_height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, chunk_type, data):
+        self.file.write(struct.pack(">I", len(data)) + chunk_type + data)
+        self.file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+    # add rows to the image, rgb is an uint8 array of shape (rows, image_width, 3)
+    def write_rows(self, rgb):
+        rows = len(rgb)
+        # each row starts with its filter type, 0: no filter
+        scanlines = np.zeros((rows, 1 + 3 * self.image_width), dtype = np.uint8)
+        scanlines[:, 1:] = rgb.reshape(rows, -1)
+        data = self.compressor.compress(scanlines.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows_written += rows
+
+    def close(self):
+        if self.rows_written != self.image_height:
+            print(f"Warning: {self.rows_written} of {self.image_height} rows written")
+        self._chunk(b"IDAT", self.compressor.flush())
+        self._chunk(b"IEND", b"")
+        self.file.close()
+
+# tile functions for render_tiled(), use functools.partial() to fill in the parameters
+
+# tile of the Mandelbrot set calculated by escape_time(), z starts at 0
+# interior_check: skip the main cardioid and period 2 bulb and stop periodic orbits
+# smooth: continuous iteration counts as float32, see escape_time()
+def mandelbrot_tile(x_tile, y_tile, number_iterations, z_threshold = 2.0, dtype = None,
+                    interior_check = True, smooth = False):
+    xx, yy = np.meshgrid(x_tile, y_tile)
+    return escape_time(0.0, xx + 1j*yy, number_iterations, z_threshold,
+                       dtype = dtype, feedback_step = 0, smooth = smooth,
+                       cardioid_check = interior_check, periodicity_check = interior_check)
+
+# tile of the Julia set for constant c calculated by escape_time(), z starts at x + iy
+def julia_tile(x_tile, y_tile, c, number_iterations, z_threshold = 2.0, dtype = None,
+               smooth = False):
+    xx, yy = np.meshgrid(x_tile, y_tile)
+    return escape_time(xx + 1j*yy, c, number_iterations, z_threshold,
+                       dtype = dtype, feedback_step = 0, smooth = smooth)
+
+# tiles as calculated by the loops in mandelbrot_pil_image.py and julia_pil_image.py,
+# see escape_index(), z starts at 0 for the Mandelbrot set and at x + iy for the Julia set
+def mandelbrot_index_tile(x_tile, y_tile, number_iterations, z_threshold = 2.0, dtype = None,
+                          interior_check = True):
+    xx, yy = np.meshgrid(x_tile, y_tile)
+    return escape_index(0.0, xx + 1j*yy, number_iterations, z_threshold, dtype = dtype,
+                        cardioid_check = interior_check, periodicity_check = interior_check)
+
+def julia_index_tile(x_tile, y_tile, c, number_iterations, z_threshold = 2.0, dtype = None):
+    xx, yy = np.meshgrid(x_tile, y_tile)
+    return escape_index(xx + 1j*yy, c, number_iterations, z_threshold, dtype = dtype)
+
+# pure Python versions of mandelbrot_index_tile() and julia_index_tile(), one pixel at a time,
+# slow but kept as reference for the vectorized versions
+def mandelbrot_index_tile_python(x_tile, y_tile, number_iterations, z_threshold = 2.0, dtype = None):
+    tile = np.zeros((len(y_tile), len(x_tile)), dtype = dtype or escape_dtype(number_iterations))
+    for column, re in enumerate(x_tile):
+        for row, im in enumerate(y_tile):
+            c = complex(re, im) # value for c
+            z = 0.0
+            for i in range(number_iterations):
+                z = z**2 + c
+                if abs(z) > z_threshold:
+                    break
+            tile[row, column] = i
+    return tile
+
+def julia_index_tile_python(x_tile, y_tile, c, number_iterations, z_threshold = 2.0, dtype = None):
+    tile = np.zeros((len(y_tile), len(x_tile)), dtype = dtype or escape_dtype(number_iterations))
+    for column, re in enumerate(x_tile):
+        for row, im in enumerate(y_tile):
+            z = complex(re, im) # initial value for z
+            for i in range(number_iterations):
+                z = z**2 + c
+                if abs(z) > z_threshold:
+                    break
+            tile[row, column] = i
+    return tile
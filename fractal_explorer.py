@@ -0,0 +1,220 @@
+# Mandelbrot and Julia set explorer
+# Interactive viewer on top of escape_time_engine.py, it uses numpy and matplotlib.
+# Zoom in and out with the mouse wheel around the mouse pointer, pan by dragging with the
+# left mouse button. The view is divided in tiles of tile_pixels x tile_pixels pixels on a fixed
+# grid for each zoom level. The tiles are calculated by a worker thread so the window stays
+# responsive, and they are kept in a cache of recently used tiles: panning back or zooming out
+# to an earlier view reuses the tiles instead of calculating them again.
+# While new tiles are calculated, enlarged tiles from lower zoom levels are shown in their place.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import math
+import queue
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib.pyplot as plt
+from escape_time_engine import escape_dtype, mandelbrot_tile, julia_tile
+
+# Parameters for calculation
+c = None # None: Mandelbrot set, a complex value: Julia set for that c
+#c = -0.512511498387847167 + 0.521295573094847167j
+max_iter = 300
+z_threshold = 2.0
+# initial view
+center_x, center_y = -0.75, 0.0
+view_width = 3.5 # width of the view in the complex plane
+tile_pixels = 256 # tiles are tile_pixels x tile_pixels pixels
+base_tile_width = 4.0 # width of a tile in the complex plane at zoom level 0
+cache_size = 500 # maximum number of tiles kept in the cache
+zoom_factor = 1.5 # zoom for each step of the mouse wheel
+# Parameters for viewing
+color_background = "#202020"
+vmax_imshow = 100 # upper limit of range on which colormap is applied
+color_map = "CMRmap" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_spectral"
+text_size = 12
+redraw_interval = 100 # milliseconds between checks for newly calculated tiles
+
+# **** tile cache ***************
+
+# least recently used tiles are removed first when the cache is full
+tile_cache = OrderedDict()
+cache_lock = threading.Lock()
+
+def cache_get(key):
+    with cache_lock:
+        tile = tile_cache.get(key)
+        if tile is not None:
+            tile_cache.move_to_end(key)
+        return tile
+
+def cache_put(key, tile):
+    with cache_lock:
+        tile_cache[key] = tile
+        tile_cache.move_to_end(key)
+        while len(tile_cache) > cache_size:
+            tile_cache.popitem(last = False)
+
+def tile_key(level, tile_x, tile_y):
+    return (level, tile_x, tile_y, max_iter, c)
+
+# **** tile calculation ***************
+
+def tile_width(level):
+    return base_tile_width / 2**level
+
+def calc_tile(level, tile_x, tile_y):
+    width = tile_width(level)
+    # the coordinates of the pixel centers of the tile
+    offsets = (np.arange(tile_pixels) + 0.5) / tile_pixels
+    x = (tile_x + offsets) * width
+    y = (tile_y + offsets) * width
+    if c is None:
+        return mandelbrot_tile(x, y, max_iter, z_threshold, dtype = escape_dtype(max_iter))
+    return julia_tile(x, y, c, max_iter, z_threshold, dtype = escape_dtype(max_iter))
+
+# an enlarged part of a cached tile of a lower zoom level, or None if there is none
+def tile_preview(level, tile_x, tile_y):
+    for levels_up in range(1, min(level, 6) + 1):
+        parent = cache_get(tile_key(level - levels_up, tile_x >> levels_up, tile_y >> levels_up))
+        if parent is not None:
+            part = tile_pixels >> levels_up
+            row = (tile_y - ((tile_y >> levels_up) << levels_up)) * part
+            column = (tile_x - ((tile_x >> levels_up) << levels_up)) * part
+            block = parent[row:row + part, column:column + part]
+            return np.repeat(np.repeat(block, 2**levels_up, axis = 0), 2**levels_up, axis = 1)
+    return None
+
+# **** worker thread ***************
+
+# the worker calculates the tiles of the latest requested view, tiles of older views are skipped
+request_queue = queue.Queue()
+view_generation = 0
+new_tiles = threading.Event()
+
+def worker():
+    while True:
+        generation, keys = request_queue.get()
+        for key in keys:
+            if generation != view_generation:
+                break # the view changed, stop calculating tiles for the old view
+            if cache_get(key) is None:
+                cache_put(key, calc_tile(*key[:3]))
+                new_tiles.set()
+
+threading.Thread(target = worker, daemon = True).start()
+
+# **** view ***************
+
+# the zoom level at which a tile pixel is not larger than a screen pixel, and the visible tiles
+def visible_tiles():
+    axes_pixels = max(1, ax.bbox.width)
+    level = math.ceil(math.log2(base_tile_width * axes_pixels / (tile_pixels * view_width)))
+    level = max(0, level)
+    width = tile_width(level)
+    view_height = view_width * ax.bbox.height / axes_pixels
+    tile_x_range = range(math.floor((center_x - view_width / 2) / width),
+                         math.floor((center_x + view_width / 2) / width) + 1)
+    tile_y_range = range(math.floor((center_y - view_height / 2) / width),
+                         math.floor((center_y + view_height / 2) / width) + 1)
+    return level, tile_x_range, tile_y_range, view_height
+
+# build the image from the cached tiles and send the missing tiles to the worker
+def update_view(request_missing = True):
+    global view_generation
+    level, tile_x_range, tile_y_range, view_height = visible_tiles()
+    mosaic = np.zeros((len(tile_y_range) * tile_pixels, len(tile_x_range) * tile_pixels),
+                      dtype = escape_dtype(max_iter))
+    missing = []
+    for row, tile_y in enumerate(tile_y_range):
+        for column, tile_x in enumerate(tile_x_range):
+            tile = cache_get(tile_key(level, tile_x, tile_y))
+            if tile is None:
+                missing.append(tile_key(level, tile_x, tile_y))
+                tile = tile_preview(level, tile_x, tile_y)
+            if tile is not None:
+                mosaic[row * tile_pixels:(row + 1) * tile_pixels,
+                       column * tile_pixels:(column + 1) * tile_pixels] = tile
+    width = tile_width(level)
+    image.set_data(mosaic)
+    image.set_extent((tile_x_range.start * width, tile_x_range.stop * width,
+                      tile_y_range.start * width, tile_y_range.stop * width))
+    ax.set_xlim(center_x - view_width / 2, center_x + view_width / 2)
+    ax.set_ylim(center_y - view_height / 2, center_y + view_height / 2)
+    ax.set_title(f"center {center_x:.12f} {center_y:+.12f}j, width {view_width:.3e}, "
+                 f"level {level}, {len(missing)} tiles to calculate, {len(tile_cache)} tiles in cache",
+                 fontsize = text_size)
+    if missing and request_missing:
+        # calculate the tiles closest to the center of the view first
+        missing.sort(key = lambda key: (key[1] - center_x / width) ** 2 + (key[2] - center_y / width) ** 2)
+        view_generation += 1
+        request_queue.put((view_generation, missing))
+    fig.canvas.draw_idle()
+
+# redraw when the worker has calculated new tiles, called by a timer in the GUI thread
+def check_new_tiles():
+    if new_tiles.is_set():
+        new_tiles.clear()
+        update_view(request_missing = False)
+
+# **** mouse events ***************
+
+drag_start = None
+
+def toolbar_active():
+    toolbar = fig.canvas.toolbar
+    return toolbar is not None and toolbar.mode != ""
+
+def on_scroll(event):
+    global center_x, center_y, view_width
+    if event.inaxes is not ax or toolbar_active():
+        return
+    factor = 1 / zoom_factor if event.button == "up" else zoom_factor
+    # zoom around the mouse pointer, the point under the pointer stays in place
+    center_x = event.xdata + (center_x - event.xdata) * factor
+    center_y = event.ydata + (center_y - event.ydata) * factor
+    view_width *= factor
+    update_view()
+
+def on_press(event):
+    global drag_start
+    if event.inaxes is ax and event.button == 1 and not toolbar_active():
+        drag_start = (event.x, event.y, center_x, center_y)
+
+def on_motion(event):
+    global center_x, center_y
+    if drag_start is None:
+        return
+    start_x, start_y, start_center_x, start_center_y = drag_start
+    # the view moves with the mouse pointer, measured in screen pixels
+    scale = view_width / ax.bbox.width
+    center_x = start_center_x - (event.x - start_x) * scale
+    center_y = start_center_y - (event.y - start_y) * scale
+    update_view()
+
+def on_release(event):
+    global drag_start
+    drag_start = None
+
+# **** window ***************
+
+fig = plt.figure(figsize = (12, 9), num = "Fractal explorer", facecolor = color_background)
+plt.style.use('dark_background')
+ax = fig.add_axes((0.05, 0.05, 0.9, 0.88))
+image = ax.imshow(np.zeros((tile_pixels, tile_pixels), dtype = escape_dtype(max_iter)),
+                  cmap = color_map, origin = 'lower', interpolation = "nearest",
+                  vmin = 0, vmax = vmax_imshow, aspect = "auto")
+ax.tick_params(labelsize = text_size - 2)
+fig.canvas.mpl_connect("scroll_event", on_scroll)
+fig.canvas.mpl_connect("button_press_event", on_press)
+fig.canvas.mpl_connect("motion_notify_event", on_motion)
+fig.canvas.mpl_connect("button_release_event", on_release)
+timer = fig.canvas.new_timer(interval = redraw_interval)
+timer.add_callback(check_new_tiles)
+timer.start()
+
+print("Fractal explorer: mouse wheel to zoom, drag with the left mouse button to pan")
+update_view()
+plt.show()
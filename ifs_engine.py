@@ -0,0 +1,176 @@
+# Iterated function system engine
+# Shared numpy code which draws the fractals of iterated function systems (IFS) such as the
+# Sierpinski triangle and the Barnsley fern, used by sierpinski_triangle_tkinter_v6.py,
+# sierpinsky_turtle_cpython.py and barnsley_fern.py.
+# An IFS is a set of affine maps, each map (a, b, c, d, e, f) moves a point x, y to
+#     x_new = a * x + b * y + e
+#     y_new = c * x + d * y + f
+# and has a probability for the random iteration. The fractal can be drawn in two ways:
+# - random iteration (the chaos game): many points hop around at the same time as numpy arrays,
+#   each step every point goes through a randomly chosen map
+# - deterministic levels: all maps are applied to a starting shape, then to the resulting shapes
+#   and so on, level by level, the shapes of the deepest level are filled with points
+# Both give arrays of points which rasterize() turns into an image array.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import numpy as np
+
+# some well known systems: (list of maps (a, b, c, d, e, f), list of probabilities)
+ifs_systems = {
+    "sierpinski": ([(0.5, 0, 0, 0.5, 0, 0),
+                    (0.5, 0, 0, 0.5, 0.5, 0),
+                    (0.5, 0, 0, 0.5, 0.25, 0.5)],
+                   [1/3, 1/3, 1/3]),
+    "barnsley_fern": ([(0, 0, 0, 0.16, 0, 0),
+                       (0.85, 0.04, -0.04, 0.85, 0, 1.6),
+                       (0.2, -0.26, 0.23, 0.22, 0, 1.6),
+                       (-0.15, 0.28, 0.26, 0.24, 0, 0.44)],
+                      [0.01, 0.85, 0.07, 0.07]),
+    "sierpinski_carpet": ([(1/3, 0, 0, 1/3, i / 3, j / 3)
+                           for j in range(3) for i in range(3) if (i, j) != (1, 1)],
+                          [1/8] * 8),
+    "heighway_dragon": ([(0.5, -0.5, 0.5, 0.5, 0, 0),
+                         (-0.5, -0.5, 0.5, -0.5, 1, 0)],
+                        [0.5, 0.5]),
+}
+
+# the maps as a float64 array with one row (a, b, c, d, e, f) per map and the probabilities
+# which add up to 1, system is a name of ifs_systems or a tuple (maps, probabilities),
+# probabilities None gives every map the same probability
+def get_ifs(system):
+    maps, probabilities = ifs_systems[system] if isinstance(system, str) else system
+    maps = np.asarray(maps, dtype = np.float64).reshape(-1, 6)
+    if probabilities is None:
+        probabilities = np.ones(len(maps))
+    probabilities = np.asarray(probabilities, dtype = np.float64)
+    return maps, probabilities / probabilities.sum()
+
+# the maps of the chaos game: each map moves a point ratio of the way towards one of the vertices
+def vertex_maps(x_vertex, y_vertex, ratio = 0.5):
+    maps = np.zeros((len(x_vertex), 6))
+    maps[:, 0] = maps[:, 3] = 1 - ratio
+    maps[:, 4] = ratio * np.asarray(x_vertex, dtype = np.float64)
+    maps[:, 5] = ratio * np.asarray(y_vertex, dtype = np.float64)
+    return maps
+
+# apply map index[i] to point x[i], y[i]
+def apply_maps(maps, index, x, y):
+    a, b, c, d, e, f = maps[index].T
+    return a * x + b * y + e, c * x + d * y + f
+
+# random iteration with number_walkers points at the same time,
+# x and y: start values, a number or an array with a value for each walker, for example the
+# end points of a previous call to continue the same walkers
+# burn_in: steps before points are kept, the walkers then lie on the fractal
+# color_lag: map_index holds the map chosen this number of steps before each point (at most burn_in),
+# this colors the parts of the fractal in a different way
+# returns x, y and map_index arrays of number_points values and the end points of the walkers
+def random_iteration(system, number_points, x = 0.0, y = 0.0, rng = None, number_walkers = 1000,
+                     burn_in = 20, color_lag = 0):
+    maps, probabilities = get_ifs(system)
+    if rng is None:
+        rng = np.random.default_rng()
+    number_walkers = max(1, min(number_walkers, number_points))
+    number_steps = -(-number_points // number_walkers)
+    color_lag = min(color_lag, burn_in)
+    x = np.array(np.broadcast_to(x, number_walkers), dtype = np.float64)
+    y = np.array(np.broadcast_to(y, number_walkers), dtype = np.float64)
+    # all random choices of maps at once
+    cumulative = np.cumsum(probabilities)
+    choices = np.searchsorted(cumulative[:-1], rng.random((burn_in + number_steps, number_walkers)),
+                              side = "right")
+    x_points = np.empty((number_steps, number_walkers))
+    y_points = np.empty((number_steps, number_walkers))
+    for step in range(burn_in + number_steps):
+        x, y = apply_maps(maps, choices[step], x, y)
+        if step >= burn_in:
+            x_points[step - burn_in] = x
+            y_points[step - burn_in] = y
+    map_index = choices[burn_in - color_lag:burn_in - color_lag + number_steps]
+    return (x_points.ravel()[:number_points], y_points.ravel()[:number_points],
+            map_index.ravel()[:number_points], (x, y))
+
+# the maps of all shapes at level depth as 2 x 2 matrices and offsets, each is a composition of
+# depth maps of the system, map_index is the index of the map at color_level in each composition:
+# 0 is the map applied last (as color_lag = 0 of random_iteration), -1 the map applied first to the
+# starting shape, which is the innermost call of a recursive drawing
+# the depth is lowered so there are at most max_shapes shapes, returns also the depth used
+def compose_levels(system, depth, max_shapes = 10**6, color_level = -1):
+    maps, probabilities = get_ifs(system)
+    number_maps = len(maps)
+    while depth > 0 and number_maps ** depth > max_shapes:
+        depth -= 1
+    linear = maps[:, :4].reshape(number_maps, 2, 2)
+    offset = maps[:, 4:]
+    matrices = np.eye(2)[np.newaxis]
+    offsets = np.zeros((1, 2))
+    # one level: each shape M x + t becomes M (L x + o) + t = M L x + (M o + t) for each map L x + o
+    for level in range(depth):
+        matrices, offsets = (matrices[:, np.newaxis] @ linear[np.newaxis],
+                             (matrices[:, np.newaxis] @ offset[np.newaxis, :, :, np.newaxis])[..., 0]
+                             + offsets[:, np.newaxis])
+        matrices = matrices.reshape(-1, 2, 2)
+        offsets = offsets.reshape(-1, 2)
+    # the shapes are ordered with the map of level 0 as most significant digit in base number_maps
+    if depth == 0:
+        return matrices, offsets, np.zeros(1, dtype = np.int64), depth
+    digit = depth - 1 - color_level % depth
+    map_index = np.arange(len(matrices)) // number_maps ** digit % number_maps
+    return matrices, offsets, map_index, depth
+
+# points on a grid with the given spacing inside a polygon, at least its first vertex
+def polygon_points(x_vertex, y_vertex, spacing):
+    x_vertex = np.asarray(x_vertex, dtype = np.float64)
+    y_vertex = np.asarray(y_vertex, dtype = np.float64)
+    x_grid = np.arange(x_vertex.min() + spacing / 2, x_vertex.max(), spacing)
+    y_grid = np.arange(y_vertex.min() + spacing / 2, y_vertex.max(), spacing)
+    x, y = [values.ravel() for values in np.meshgrid(x_grid, y_grid)]
+    # even-odd rule: a point is inside if a ray to the right crosses an odd number of edges
+    inside = np.zeros(len(x), dtype = bool)
+    for x1, y1, x2, y2 in zip(x_vertex, y_vertex, np.roll(x_vertex, -1), np.roll(y_vertex, -1)):
+        if y1 == y2:
+            continue
+        crosses = (y1 > y) != (y2 > y)
+        inside ^= crosses & (x < x1 + (y - y1) * (x2 - x1) / (y2 - y1))
+    if not inside.any():
+        return x_vertex[:1], y_vertex[:1]
+    return x[inside], y[inside]
+
+# deterministic levels: the starting polygon is filled with points close enough together to
+# leave no gaps of pixel_size after the maps of level depth are applied to it
+# max_points: budget of points, with more the points are spread further apart
+# returns x, y and the map_index (see compose_levels) of each point and the depth used
+def level_points(system, depth, x_vertex, y_vertex, pixel_size, max_points = 4 * 10**6,
+                 max_shapes = 10**6, color_level = -1):
+    matrices, offsets, map_index, depth = compose_levels(system, depth, max_shapes, color_level)
+    # largest stretch of a shape at this level: the largest singular value of the 2 x 2 matrices
+    squares = (matrices ** 2).sum(axis = (1, 2))
+    determinants = matrices[:, 0, 0] * matrices[:, 1, 1] - matrices[:, 0, 1] * matrices[:, 1, 0]
+    singular = np.sqrt((squares + np.sqrt(np.maximum(squares ** 2 - 4 * determinants ** 2, 0))) / 2)
+    scale = max(singular.max(), 1e-12)
+    spacing = pixel_size / (2 * scale)
+    x_start, y_start = polygon_points(x_vertex, y_vertex, spacing)
+    while len(matrices) * len(x_start) > max_points and len(x_start) > 1:
+        spacing *= 1.5
+        x_start, y_start = polygon_points(x_vertex, y_vertex, spacing)
+    x = (matrices[:, 0, 0, np.newaxis] * x_start + matrices[:, 0, 1, np.newaxis] * y_start
+         + offsets[:, 0, np.newaxis])
+    y = (matrices[:, 1, 0, np.newaxis] * x_start + matrices[:, 1, 1, np.newaxis] * y_start
+         + offsets[:, 1, np.newaxis])
+    return x.ravel(), y.ravel(), np.repeat(map_index, len(x_start)), depth
+
+# the points as a uint8 image array with rows from top to bottom, values is the value of each
+# point (for example map_index + 1), 0 is the background, later points are drawn over earlier ones
+def rasterize(x, y, width, height, x_range, y_range, values = 1):
+    column = np.floor((x - x_range[0]) * (width / (x_range[1] - x_range[0]))).astype(np.int64)
+    row = np.floor((y_range[1] - y) * (height / (y_range[1] - y_range[0]))).astype(np.int64)
+    inside = (column >= 0) & (column < width) & (row >= 0) & (row < height)
+    image = np.zeros((height, width), dtype = np.uint8)
+    image[row[inside], column[inside]] = np.broadcast_to(values, np.shape(x))[inside]
+    return image
+
+# an rgb image array as binary PPM data, which tkinter's PhotoImage reads directly
+def ppm_data(rgb):
+    height, width = rgb.shape[:2]
+    return f"P6 {width} {height} 255 ".encode() + np.ascontiguousarray(rgb, dtype = np.uint8).tobytes()
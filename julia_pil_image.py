@@ -1,38 +1,42 @@
-# Julia Fractal using only math and PIL libraries
+# Julia Fractal using numpy and the PIL library
 # the image is calculated and opened in the system's standard image viewer
 # as PNG file
 # PIL (Pillow) does not come with a standard CPython installation
 # see: https://pypi.org/project/pillow/
+# the iteration counts are calculated in tiles on several processes,
+# see render_tiled() in escape_time_engine.py, the colors are applied with
+# a lookup table and the complete image is passed to PIL at once
 #
-from PIL import Image, ImageDraw
-from math import sqrt
+from functools import partial
+import numpy as np
+from PIL import Image
+from escape_time_engine import render_tiled, julia_index_tile, julia_index_tile_python
 # parameters
 screen_width = 1600; screen_height = 1000 # image size in pixels
-# create a new PIL Image object
-img = Image.new("RGB",(screen_width, screen_height),
-                "black")
-draw = ImageDraw.Draw(img)
-# calculation and plotting
+number_processes = None # None: use all cores, 1: calculate in a single process
+backend = "numpy" # "numpy": vectorized calculation, "python": pure CPython loops as reference
 c = -0.4 + 0.6j # complex constant for julia fractal
 # other interesting values:
 # -0.5125 + 0.5213j, -0.499 + 0.5213j, -0.498 + 0.5213j,
 # -0.8 + 0.156, -0.7269 + 0.1889
-for x in range(0, screen_width):
-    re = x / (screen_width - 1) * 3.2 - 1.6
-    for y in range(0, screen_height):
-        im = y / (screen_height - 1) * 2.0 - 1.0
-        z = complex(re, im) # initial value for z
-        for i in range(1025): # counter will be measure for how fast z grows
-            z = z**2 + c
-            if abs(z) > 2.0:
-                break
-        i = int(sqrt(i)*8) # apply non linear scaling on i
-        r = i % 33 * 8; r = min(255, r) # calculate color comp. from i
-        g = i % 129 * 2; g = min(255, g)
-        b = i % 65 * 4; b = min(255, b)
-        col = (r,g,b)
-        draw.point([x, y], fill = col)
-    if x % 100 == 0:
-        print(f"{x/(screen_width-1):.0%} calculated")    
-# plotting finished, image opens in standard img viewer
-img.show()
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the image tiles import it
+if __name__ == "__main__":
+    # calculation, the initial values for z are re + j * im
+    re_values = np.arange(screen_width) / (screen_width - 1) * 3.2 - 1.6
+    im_values = np.arange(screen_height) / (screen_height - 1) * 2.0 - 1.0
+    # counter i for each pixel will be measure for how fast z grows
+    tile_function = {"numpy": julia_index_tile,
+                     "python": julia_index_tile_python}[backend]
+    i_array = render_tiled(partial(tile_function, c = c, number_iterations = 1025),
+                           re_values, im_values, np.uint16, number_processes = number_processes)
+    # lookup table with the color for each possible value of i
+    i = (np.sqrt(np.arange(1025))*8).astype(int) # apply non linear scaling on i
+    r = np.minimum(255, i % 33 * 8) # calculate color comp. from i
+    g = np.minimum(255, i % 129 * 2)
+    b = np.minimum(255, i % 65 * 4)
+    color_table = np.stack((r, g, b), axis = -1).astype(np.uint8)
+    # plotting, the lookup table turns the array of counters into an array of RGB colors
+    img = Image.fromarray(color_table[i_array], "RGB")
+    # plotting finished, image opens in standard img viewer
+    img.show()
@@ -0,0 +1,116 @@
+# Julia set parameter sweep
+# This code calculates an animation of Julia sets for a path of values of c, here a circle
+# around c_center. It uses escape_time_engine.py for the calculations and PIL to write the frames.
+# Several frames are calculated at once as a 3D array (frame, row, column), and batches of
+# frames can be spread over several processes.
+# The frames are written one by one to an animated GIF file or to a sequence of PNG files,
+# so only a few batches of frames are in memory at any time, no matter how many frames there are.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+from PIL import Image, GifImagePlugin
+from escape_time_engine import escape_time
+
+# Parameters for calculation
+image_width = 600
+image_height = 400
+x_low, x_high = -1.5, 1.5
+y_low, y_high = -1.0, 1.0
+number_iterations = 300
+z_threshold = 2.0
+# path of c: a circle with radius c_radius around c_center
+c_center = -0.512 + 0.521j
+c_radius = 0.02
+number_frames = 120
+frames_per_batch = 8 # frames calculated together in one 3D array
+number_processes = 1 # number of processes calculating batches of frames
+# Parameters for output
+output = "gif" # "gif": one animated GIF file, "png": a sequence of PNG files
+gif_filename = "julia_sweep.gif"
+png_prefix = "julia_sweep_" # the PNG files are named julia_sweep_0000.png, julia_sweep_0001.png, ...
+frame_duration = 40 # milliseconds per frame in the GIF file
+vmax_color = 60 # iteration count which gets the last color of the color map
+color_map = "inferno" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_spectral"
+
+def c_path():
+    angles = np.linspace(0, 2 * np.pi, number_frames, endpoint = False)
+    return c_center + c_radius * np.exp(1j * angles)
+
+# calculate a batch of frames, returns the color indices as a uint8 array (frame, row, column)
+def render_batch(c_values):
+    x = np.linspace(x_low, x_high, image_width)
+    y = np.linspace(y_low, y_high, image_height)
+    # rows from top to bottom in the image, so the highest y value first
+    z_array = x[np.newaxis, :] + 1j * y[::-1, np.newaxis]
+    # z has shape (1, rows, columns) and c (frames, 1, 1), together they give all frames
+    counts = escape_time(z_array[np.newaxis, :, :], np.asarray(c_values)[:, np.newaxis, np.newaxis],
+                         number_iterations, z_threshold, feedback_step = 0, smooth = True)
+    np.multiply(counts, 255 / vmax_color, out = counts)
+    return np.clip(counts, 0, 255).astype(np.uint8)
+
+# the batches of frames in order, at most 2 batches per process are calculated ahead
+def frame_batches(c_values):
+    batches = [c_values[start:start + frames_per_batch]
+               for start in range(0, len(c_values), frames_per_batch)]
+    if number_processes == 1:
+        for batch in batches:
+            yield render_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers = number_processes) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(render_batch, batch))
+            if len(pending) >= 2 * number_processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# a palette image with the colors of the color map
+def frame_image(color_indices, palette):
+    image = Image.fromarray(color_indices, "P")
+    image.putpalette(palette)
+    return image
+
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the batches import it
+if __name__ == "__main__":
+    print("Julia set parameter sweep using Python, numpy and PIL")
+    print("-----------------------------------------------------")
+    # 256 colors of the color map as palette for all frames
+    palette = (plt.get_cmap(color_map)(np.linspace(0, 1, 256))[:, :3] * 255).astype(np.uint8)
+    palette = palette.ravel().tolist()
+    c_values = c_path()
+    print(f"{number_frames} frames of {(image_height, image_width)} pixels, "
+          f"c on a circle with radius {c_radius} around {c_center}")
+    start_time = time.perf_counter()
+    frame_counter = 0
+    gif_file = open(gif_filename, "wb") if output == "gif" else None
+    try:
+        for batch in frame_batches(c_values):
+            for color_indices in batch:
+                image = frame_image(color_indices, palette)
+                if gif_file is not None:
+                    if frame_counter == 0:
+                        # the GIF header with the global palette, the animation repeats forever
+                        header, used_palette_colors = GifImagePlugin.getheader(
+                            image, info = {"loop": 0, "duration": frame_duration, "optimize": False})
+                        gif_file.write(b"".join(header))
+                    gif_file.write(b"".join(GifImagePlugin.getdata(image, duration = frame_duration)))
+                else:
+                    image.save(f"{png_prefix}{frame_counter:04d}.png")
+                frame_counter += 1
+            print(f"Frame {frame_counter} of {number_frames} written\r", end = "")
+        if gif_file is not None:
+            gif_file.write(b";") # end of the GIF file
+    finally:
+        if gif_file is not None:
+            gif_file.close()
+    print(f"\n{frame_counter} frames written in {time.perf_counter() - start_time:.1f} s")
+    if output == "gif":
+        print(f"Saved as \"{gif_filename}\"")
@@ -1,36 +1,82 @@
 # Julia Fractal using only math and tkinter libraries
+# the image is calculated progressively: a coarse preview of 16 x 16 pixel blocks is shown
+# first and then refined in passes with smaller blocks down to blocks of step pixels. Each pass only
+# calculates the pixels which are not yet known from the previous passes.
+# The pixels are drawn in a single PhotoImage instead of one canvas item per pixel.
+# The calculation is done in short slices between tkinter events, so the window stays
+# responsive and closing it stops the calculation.
 from tkinter import *
 from math import *
+import time
 # parameters
-step = 1 # defines resolutuon vs speed (1: max resolution, slowest)
+step = 1 # smallest block size, defines resolution vs speed (1: max resolution, slowest)
+coarsest_step = 16 # block size of the first preview pass
 screen_width = 1600; screen_height = 1000 # image size in pixels
+time_slice = 0.05 # seconds of calculation between updates of the window
 # make tkinter and canvas objects
 root = Tk()
 root.title("Julia Fractal using Python and Tkinter")
 canvas1 = Canvas(root, background = "black",
            height = screen_height, width = screen_width)
 canvas1.pack()
+image1 = PhotoImage(width = screen_width, height = screen_height)
+canvas1.create_image(0, 0, image = image1, anchor = NW)
 # calculation and plotting
 c = complex(-0.5125, 0.5213) # complex constant for julia fractal
-for x in range(0, screen_width, step):
+max_iterations = 1024
+# color in "#rrggbb" format for each possible number of iterations
+color_table = []
+for i in range(max_iterations + 1):
+  i = int(sqrt(i)*8) # apply non linear scaling on i
+  r = i % 33 * 8; r = min(255, r) # calculate color comp. from i
+  g = i % 129 * 2; g = min(255, g)
+  b = i % 65 * 4; b = min(255, b)
+  color_table.append(f"#{r:02X}{g:02X}{b:02X}") # hex values
+# color of each calculated pixel, None if not yet calculated
+pixel_colors = [[None] * screen_width for y in range(screen_height)]
+
+def julia_color(x, y):
   re = x / (screen_width - 1) * 3.0 - 1.5
   #re = x / (screen_width - 1) * 1.5 - 0.75 # zoomed in version
-  for y in range(0, screen_height, step):
-    im = y / (screen_height - 1) * 2.0 - 1.0
-    #im = y / (screen_height - 1) * 1.0 - 0.5 # zoomed in version
-    z = complex(re, im) # initial value for z
-    i = 0 # counter will be measure for how fast z grows
-    while abs(z) < 2.0 and i < 1024: # exit loop if |z| > 2.0 or 1024 iterations completed
-      z = z**2 + c
-      i += 1
-    i = int(sqrt(i)*8) # apply non linear scaling on i
-    r = i % 33 * 8; r = min(255, r) # calculate color comp. from i
-    g = i % 129 * 2; g = min(255, g)
-    b = i % 65 * 4; b = min(255, b)
-    col_str = f"#{r:02X}{g:02X}{b:02X}" # color in "#rrggbb" format, hex values
-    canvas1.create_rectangle(x, y, x + step, y + step,
-                             fill = col_str, outline = col_str) # plot ontkinter canvas
-  if x % 50 == 0:
-    canvas1.update() # each 50 cycles show updated canvas
-# plotting finished, window shows
+  im = y / (screen_height - 1) * 2.0 - 1.0
+  #im = y / (screen_height - 1) * 1.0 - 0.5 # zoomed in version
+  z = complex(re, im) # initial value for z
+  i = 0 # counter will be measure for how fast z grows
+  while abs(z) < 2.0 and i < max_iterations: # exit loop if |z| > 2.0 or 1024 iterations completed
+    z = z**2 + c
+    i += 1
+  return color_table[i]
+
+# generator which calculates and draws one row of blocks at a time
+def render_passes():
+  block = max(coarsest_step, step)
+  while True:
+    for y in range(0, screen_height, block):
+      row = pixel_colors[y]
+      for x in range(0, screen_width, block):
+        # pixels on the grid of the previous pass are already known
+        if row[x] is None:
+          row[x] = julia_color(x, y)
+      # each calculated pixel is drawn as a block x block square
+      row_data = "{" + " ".join(row[x] for x in range(0, screen_width, block)
+                                for repeat in range(min(block, screen_width - x))) + "}"
+      rows = min(block, screen_height - y)
+      image1.put(" ".join([row_data] * rows), to = (0, y))
+      yield
+    # the last pass is at exactly step, also when step is not a power of two
+    if block == step:
+      break
+    block = max(block // 2, step)
+
+# calculate during time_slice seconds, then let tkinter handle events and continue later
+def render_slice():
+  end_time = time.perf_counter() + time_slice
+  for _ in renderer:
+    if time.perf_counter() > end_time:
+      root.after(1, render_slice)
+      return
+
+renderer = render_passes()
+root.after(1, render_slice)
+# window shows while the fractal is refined
 mainloop()
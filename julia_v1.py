@@ -8,6 +8,9 @@
 
 import numpy as np
 import matplotlib.pyplot as plt
+from functools import partial
+from progress_monitor import ProgressMonitor
+from escape_time_engine import escape_dtype, render_tiled, julia_tile
 
 # Parameters for calculation
 image_width = 1200
@@ -22,6 +25,11 @@ y_low, y_high = -1.0, 1.0
 #y_low, y_high = -0.02, 0.333
 number_iterations = 700 
 z_threshold = 2.0
+number_processes = None # None: use all cores, 1: calculate in a single process
+smooth_coloring = True # True: continuous iteration counts as float32 without color bands, False: integer counts
+# progress reports per completed tile as JSON lines, see progress_monitor.py
+progress_log = None # None: no log, "-": standard output, or a filename such as "progress.jsonl"
+status_file = None # None or a filename such as "status.json" which always holds the latest report
 c_initial = -0.512511498387847167 + 0.521295573094847167j # very sensitive
 # Parameters for viewing
 color_background = "#202020"
@@ -30,68 +38,63 @@ color_map = "inferno" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_s
 png_filename = "julia.png"
 text_size = 14
 
-print("julia Set using Python, numpy and matplotlib")
-print("--------------------------------------------")
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the image tiles import it
+if __name__ == "__main__":
+    print("julia Set using Python, numpy and matplotlib")
+    print("--------------------------------------------")
 
-# prepare numpy arrays for all values of c, z and the julia_array image
-x = np.linspace(x_low, x_high, image_width)
-y = np.linspace(y_low, y_high, image_height)
-xx, yy = np.meshgrid(x, y)
-# the array with all complex values for z
-z_array = xx + 1j*yy
-# the array with the initial values for c
-c_array = np.full(z_array.shape, c_initial)
-# the array which will be filled to cantain the julia_array image
-julia_array = np.zeros(c_array.shape, dtype = np.uint8)
-# this array contains boolean variables to store which z values exceed the threshold
-z_exceed_threshold_array = np.full(c_array.shape, False)
-print(f"Starting {number_iterations} iterations of {julia_array.shape} array")
-# the loop calculates z values for the complete array in each iteration
-for counter in range(number_iterations):
-    # calculate the next z values for those elements which do not (yet) exceed threshold
-    z_array = np.where(z_exceed_threshold_array == False, z_array ** 2 + c_array, z_array)
-    # decide which elements of the new z values exceed threshold
-    z_exceed_threshold_array = np.abs(z_array) >= z_threshold
-    # update julia_array with counter value for those elemenst which exceed threshold for the first time
-    julia_array = np.where(julia_array == 0, z_exceed_threshold_array * counter, julia_array)
-    if counter % 10 == 0:
-        print(f"Iteration {counter} of {number_iterations} completed\r", end = "")
+    # the x and y values of the columns and rows of the julia_array image,
+    # they are the real and imaginary parts of the initial values for z
+    x = np.linspace(x_low, x_high, image_width)
+    y = np.linspace(y_low, y_high, image_height)
+    print(f"Starting {number_iterations} iterations of {(image_height, image_width)} array")
+    # the image is split in tiles which are calculated in parallel by several processes,
+    # the escape time engine only iterates the elements which do not (yet) exceed the threshold,
+    # the returned julia_array contains the iteration count at which each element exceeded it
+    with ProgressMonitor(image_width * image_height, label = "julia", unit = "pixels",
+                         console = False, log_filename = progress_log, status_filename = status_file) as monitor:
+        julia_array = render_tiled(
+            partial(julia_tile, c = c_initial, number_iterations = number_iterations, z_threshold = z_threshold,
+                    smooth = smooth_coloring),
+            x, y, np.float32 if smooth_coloring else escape_dtype(number_iterations),
+            number_processes = number_processes, monitor = monitor)
 
-# optionally save the julia array as an png image file
-print(f"julia image of {julia_array.shape} created")
-answer = input(f"Save as \"{png_filename}\" image file? y/n ").lower()
-if answer == "y":
-    plt.imsave(png_filename,
-        julia_array, 
+    # optionally save the julia array as an png image file
+    print(f"julia image of {julia_array.shape} created")
+    answer = input(f"Save as \"{png_filename}\" image file? y/n ").lower()
+    if answer == "y":
+        plt.imsave(png_filename,
+            julia_array, 
+            cmap = color_map, 
+            origin='lower',
+            vmin = 0,
+            vmax = vmax_imshow)
+        print(f"Saved as \"{png_filename}\"")
+
+    # create data for axis labels
+    x_label_pos = np.linspace(0, image_width, 10)
+    x_label = [f"{x:.5f}" for x in np.linspace(x_low, x_high, 10)]
+    y_label_pos = np.linspace(0, image_height, 10)
+    y_label = [f"{y:.5f}" for y in np.linspace(y_low, y_high, 10)]
+
+    # display julia array in a matplotlib window, create new figure object
+    fig = plt.figure(figsize = (15, 10), num = "Julia", facecolor = color_background)
+    # use dark style wth white letters and set title
+    plt.style.use('dark_background')
+    plt.title("julia", 
+                fontsize = text_size + 2, fontweight = "bold", y = 1.02)
+    # set labels on axes
+    plt.xticks(ticks = x_label_pos, labels = x_label)
+    plt.yticks(ticks = y_label_pos, labels = y_label)
+    plt.tick_params(labelsize = text_size)
+    # display the julia array as an image
+    plt.imshow(julia_array, 
         cmap = color_map, 
         origin='lower',
         vmin = 0,
         vmax = vmax_imshow)
-    print(f"Saved as \"{png_filename}\"")
-
-# create data for axis labels
-x_label_pos = np.linspace(0, image_width, 10)
-x_label = [f"{x:.5f}" for x in np.linspace(x_low, x_high, 10)]
-y_label_pos = np.linspace(0, image_height, 10)
-y_label = [f"{y:.5f}" for y in np.linspace(y_low, y_high, 10)]
-
-# display julia array in a matplotlib window, create new figure object
-fig = plt.figure(figsize = (15, 10), num = "Julia", facecolor = color_background)
-# use dark style wth white letters and set title
-plt.style.use('dark_background')
-plt.title("julia", 
-            fontsize = text_size + 2, fontweight = "bold", y = 1.02)
-# set labels on axes
-plt.xticks(ticks = x_label_pos, labels = x_label)
-plt.yticks(ticks = y_label_pos, labels = y_label)
-plt.tick_params(labelsize = text_size)
-# display the julia array as an image
-plt.imshow(julia_array, 
-    cmap = color_map, 
-    origin='lower',
-    vmin = 0,
-    vmax = vmax_imshow)
-# define space between image and borders
-plt.subplots_adjust(left = 0.08, right = 0.95, bottom = 0.05, top = 0.915)
+    # define space between image and borders
+    plt.subplots_adjust(left = 0.08, right = 0.95, bottom = 0.05, top = 0.915)
 
-plt.show()
+    plt.show()
@@ -1,11 +1,27 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from math import *
+from attractor_engine import render_histogram, tone_map
 
 # parameters for calculation
 image_width=2000
 image_height=1500
 number_iterations = 8000000
+number_processes = 1 # None: use all cores, 1: calculate one orbit in a single process
+random_seed = 1 # seed for the starting points of the orbits in the other processes, None: different each run
+histogram_dtype = np.uint32 # np.uint16 uses half the memory, counts above 65535 are clipped
+bilinear_splatting = False # spread each point over the 4 nearest pixels, smoother images with fewer iterations
+supersampling = 1 # 2 or 4: count with bilinear_splatting at 2 or 4 times the resolution, then add blocks of pixels
+# if this file exists the histogram and orbits saved in it by an earlier run with the same parameters
+# are continued, the new result is saved in it at the end, None: no checkpoint file
+checkpoint_filename = None # for example "kingsdream_checkpoint.npz"
+# progress reports for a job scheduler, see progress_monitor.py
+progress_log = None # JSON lines are appended to this file, for example "kingsdream_progress.jsonl", "-": print them
+status_file = None # this file always holds the latest report as JSON
+xrange = (-2, 2); yrange = (-2, 2)
+# 0: calculate one long orbit, > 0: number of orbits calculated together as numpy arrays,
+# this is much faster when numba is not installed, the first burn_in points of each orbit are skipped
+number_seeds = 0
+burn_in = 100
 # constants for fractal
 a = 2.879879 
 b = -0.765145
@@ -14,33 +30,27 @@ d = 0.744728
 # Parameters for viewing
 color_background = "#202020"
 color_map = "inferno" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_spectral"
+tone_mapping = "log" # "log", "equalize" (histogram equalization) or "linear"
+gamma = 1.0 # < 1 makes faint areas brighter
 png_filename = "kingsdream.png"
 text_size = 14
 
 def calc_fractal(N):
     print(f"Calculating fractal\n{N} iterations\n{image_height} rows, {image_width} colums")
-    fractal=np.zeros((image_height,image_width))
+    fractal=np.zeros((image_height,image_width), dtype = histogram_dtype)
     x,y=2.0,2.0 # initial values
-    step_feedback = N // 10  # only for printing progress
-    for counter in range(N):
-        x,y = sin(a*x)+b*sin(a*y), sin(c*x)+d*sin(c*y)
-#       x,y = sin(a*x)+b*sin(a*y*1.3), sin(c*x)+d*sin(c*y*2)
-#       x,y = sin(a*x*1.2)+b*sin(a*y*0.9), sin(c*x*1.4)+d*sin(c*y*2)
-        column = int(image_width * (x + 2) / 4)
-        row = int(image_height *(y + 2) / 4)
-        fractal[row,column] += 1
-        if counter % step_feedback == 0:
-            print(f"Iteration {counter} of {number_iterations} completed")
+    # the orbit is iterated and counted by attractor_engine.py, compiled when numba is installed
+    # variations of the map can be registered there, for example:
+    # x,y = sin(a*x)+b*sin(a*y*1.3), sin(c*x)+d*sin(c*y*2)
+    # x,y = sin(a*x*1.2)+b*sin(a*y*0.9), sin(c*x*1.4)+d*sin(c*y*2)
+    render_histogram("kings_dream", (a, b, c, d), x, y, N, fractal, xrange, yrange,
+                     number_processes = number_processes, random_seed = random_seed,
+                     number_seeds = number_seeds, burn_in = burn_in,
+                     checkpoint_filename = checkpoint_filename,
+                     splat = bilinear_splatting, supersampling = supersampling,
+                     progress_log = progress_log, status_file = status_file)
     return fractal
 
-def log_convert(fractal):
-    # apply a log conversion for showing and saving fractal
-    # matplotlib.pyplot.imsave() does not seem to support norm="log" option as imshow() does
-    fractal[fractal==0.] = np.nan # avoid log(0) warnings, replace 0.0 with nan
-    fractal = np.log(fractal)
-    fractal[np.isnan(fractal)] = 0. # imsave does not like the nan values, replace nan back with zeros
-    return(fractal)
-
 def save_image(fractal, fname):
     # optionally save the mandelbrot array as an png image file
     print(f"Fractal image of {fractal.shape} created")
@@ -48,7 +58,7 @@ def save_image(fractal, fname):
     if answer == "y":
         plt.imsave(fname,
             fractal, 
-            cmap = color_map, 
+            cmap = color_map, vmin = 0, vmax = 255,
             origin='lower')
         print(f"Saved as \"{fname}\"")
 
@@ -59,16 +69,20 @@ def plot_fractal(fractal):
     plt.title("King's Dream Fractal", 
                 fontsize = text_size + 2, fontweight = "bold", y = 1.02)
     plt.imshow(fractal, 
-        cmap = color_map, 
+        cmap = color_map, vmin = 0, vmax = 255,
         origin='lower')
     plt.subplots_adjust(left = 0.05, right = 0.95, bottom = 0.05, top = 0.915)
     plt.show()
 
-# calculate fractal
-pixel_array = calc_fractal(number_iterations)
-# log convertion to make smaller values more visible
-pixel_array = log_convert(pixel_array)
-# optionally save as png image file
-save_image(pixel_array, png_filename)
-# display fractal
-plot_fractal(pixel_array)
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the orbits import it
+if __name__ == "__main__":
+    # calculate fractal
+    pixel_array = calc_fractal(number_iterations)
+    # log, equalize or linear conversion to 0...255 to make smaller values more visible
+    print(f"Applying a {tone_mapping} conversion for showing and saving fractal")
+    pixel_array = tone_map(pixel_array, tone_mapping, gamma)
+    # optionally save as png image file
+    save_image(pixel_array, png_filename)
+    # display fractal
+    plot_fractal(pixel_array)
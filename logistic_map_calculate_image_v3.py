@@ -26,6 +26,8 @@
 # the logistic map is represented as a numpy array
 # the image of the map is displayed and can be 
 # saved as a PNG image file
+# the calculation is done by bifurcation_engine.py, which can also
+# calculate other maps such as the sine, Gauss or Ricker map
 
 # matplotlib is used to display the image
 import matplotlib.pyplot as plt
@@ -33,9 +35,16 @@ import matplotlib.pyplot as plt
 import numpy as np
 # PIL is used to save to PNG
 from PIL import Image
+# the bifurcation engine iterates all columns at once
+from bifurcation_engine import bifurcation_analysis, histogram_image
 
 # *** parameters ****
-# total number of iterations
+# name of the map in bifurcation_engine.py: "logistic", "sine", "gauss", "ricker"
+map_name = "logistic"
+# number of iterations which are not shown, the transient before the points
+# settle on the attractor of each value of a
+burn_in = 500
+# number of iterations which are counted in the image
 loops = 4000
 # Logistic map wil be nrows x ncols array
 ncols = 5333
@@ -43,69 +52,63 @@ nrows = 3000
 # start and end value of parameter a
 astart = 3.5
 aend = 4.0
-# default file name for saving as PNG
+# default file name for saving as PNG, the Lyapunov exponent and period
+# of each column are saved beside it as logistic_analysis.npz
 filename_default = "logistic.png"
-
-# the numpy array to contain the logistic map is fllled with zeros
-# this is the picture to be viewed later, dimensions of logistic 
-# are nrows x ncols
-logistic = np.zeros((nrows, ncols))
+# longest period which is detected
+max_period = 64
 
 # values for parameter a are defined, a is here a vector of
 # increasing values between astart en aend to be 
 # used for each column of logistic
 a = np.linspace(astart, aend, ncols)
 
-# the initial values for x are defined, x is here a vector holding values to be 
-# used for each column of logistic 
-x = np.full(ncols, 0.5)
-
-# vector containing all the column indices of logistic map
-columns = np.arange(ncols)
-
 print("This code calculates a image of the bifurcation diagram for the logistic map")
 print("\n  Xn+1 = a. Xn.(1 - Xn)")
 print("\niterations are done for increasing values of 'a'")
 print(f"parameter 'a' will range from {astart} to {aend}")
 print(f"the logistic map is represented as a {nrows} x {ncols} numpy array")
 print("the image of the map is displayed and can be saved as a PNG image file")
-print(f"\nstarting {loops} iterations\n") 
-
-# iterate loops and perform calculations for whole array logistic in each step
-# through vectorised functionality of numpy
-for _ in range(loops):
-    # perform logistic function for all x values at once
-    # calculate new values for x for all the different a parameters
-    # in each loop iteration, both x and a are vectors
-    x = a * x * (1.0 - x)  
-    # calculate row indices for all values of x it uses a vectorised
-    # conversion to integer via .astype(int), 1 is subtracted because
-    # index anways starts at zero
-    rows = (x * nrows).astype(int) - 1 
-    # elements of array logistic are incremented by 1 
-    # at rows determined by linear array rows 
-    # and over all columns as directed by columns = np.arange(ncols)
-    logistic[rows, columns] += 1
+print(f"\nstarting {burn_in} + {loops} iterations\n") 
+
+# iterate burn_in + loops times and perform calculations for all columns at once
+# through vectorised functionality of numpy, the first burn_in iterations are not counted,
+# in each further iteration the element of each column at the row of its new x value is
+# incremented by 1, the array logistic holds these counts as unsigned integers
+# with row 0 for x = 0
+# in the same pass the Lyapunov exponent and the period of the orbit of each column are calculated
+analysis = bifurcation_analysis(map_name, a, loops, nrows, burn_in = burn_in, max_period = max_period)
+logistic = analysis["histogram"]
+lyapunov = analysis["lyapunov"]
+period = analysis["period"]
 
 # print some info also keep maximum value and average value of array logistic as variables for later
 print("Calculations finalised:")
 print("  dimensions of array:", logistic.shape)
 print("  number of elements:", logistic.size)
+print("  type of elements:", logistic.dtype)
 print(f"  size of array in MB: {(logistic.nbytes / 1048576):.2f}")
 logistic_max = np.max(logistic)
 print("  maximum value in array:", logistic_max)
 print("  minimum value in array:", np.min(logistic))
 logistic_average = np.average(logistic)
 print("  average value in array:", logistic_average)
+# the columns classified by their Lyapunov exponent and period
+print(f"  chaotic columns (Lyapunov exponent > 0): {np.count_nonzero(lyapunov > 0)}")
+print(f"  periodic columns (period {max_period} or less): {np.count_nonzero(period)}")
+for p in (1, 2, 3, 4, 5, 6, 7, 8):
+    columns_p = np.flatnonzero(period == p)
+    if len(columns_p) > 0:
+        print(f"    period {p}: {len(columns_p)} columns, a from {a[columns_p[0]]:.6f} to {a[columns_p[-1]]:.6f}")
 
 
 # converting the array logistic to 8 bit integer values between 0 and 255
 # loads faster in matplotlib and is suited for saving as image file
-# also flipping the image vertically using negative step on the row index
+# also flipping the image vertically so x = 1 is at the top
 # vmaximum is a clipping value above which pixel greyscale will be 100% white
 vmaximum = 7.0 * logistic_average
 print("\nConverting the array to 8 bit integer values")
-logistic = np.clip(logistic[::-1,:] * 255 / vmaximum, 0, 255).astype(np.uint8)
+logistic = histogram_image(logistic, vmaximum)
 print(f"size of array in MB: {(logistic.nbytes / 1048576):.2f}")
 
 # save as PNG image file?
@@ -125,6 +128,10 @@ if answer == "y":
     image = Image.fromarray(logistic)
     # Use the save method of the image object
     image.save(image_file_name, compress_level = 3)
+    # the analysis as compact arrays, one value per column
+    analysis_file_name = image_file_name[:-4] + "_analysis.npz"
+    np.savez_compressed(analysis_file_name, a = a, lyapunov = lyapunov, period = period)
+    print(f"saving Lyapunov exponent and period of each column as {analysis_file_name}")
 
 print("\ngenerating Matplotlib display")
 
@@ -21,41 +21,80 @@
 #  
 # Generating a bifurcation diagram of the Logistic Map
 # using Numpy and Matplotlib
+# the orbit is split in columns for which the Lyapunov exponent and the period
+# are calculated by bifurcation_engine.py, they are plotted below the diagram
+# the orbit can be calculated as one serial loop or in chunks: the range of A is split in chunks
+# which are iterated together as numpy arrays, optionally by several processes, each chunk
+# starts after a short burn-in at its first value of A, this makes sweeps of 1e8 steps feasible
 #
 import matplotlib.pyplot as plt
 import numpy as np
+from bifurcation_engine import sweep_a, sweep_orbit, sweep_analysis
 
 # total number of iterations, start and end value of parameter A
 loops, astart, aend = int(2e6), 3.5, 4.0
+# "chunks": the orbit is calculated in chunks by bifurcation_engine.py, "serial": one python loop
+sweep_mode = "chunks"
+# number of chunks and iterations at the first value of A of each chunk before it is stored
+number_chunks, chunk_burn_in = 2000, 200
+number_processes = 1 # None: use all cores, 1: calculate the chunks in this process
+# number of columns for the Lyapunov exponent and period, longest period which is detected
+number_columns, max_period = 2000, 64
+# the arrays a, lyapunov and period of the columns are saved in this file, None: not saved
+analysis_filename = "logistic_sweep_analysis.npz"
+# at most this many points are plotted, for longer sweeps every n-th point is plotted
+plot_points = int(2e6)
 
-# the numpy array to contain the x values of the logistic map is fllled with zeros
-X = np.zeros(loops)
-# the first value is initiated
-X[0]=0.5
-
-# the numpy array to contain the values for parameter a
-A = np.linspace(astart, aend, loops)
-
-# loops iterate the logistic map function for small increases of A
-print(f"Iterating through {loops} steps, with values for A from {astart} to {aend}")
-for index in range(loops - 1):
-    X[index+1] = A[index] * X[index] * (1.0 - X[index])
-print(f"Iterations complete, numpy arrays have lengths of A:{A.shape[0]} X:{X.shape[0]}")
-
-# plot with dark background
-plt.style.use('dark_background')
-# set the size of the plot
-plt.figure(figsize=(15, 10), num="Logistic map using Python, Numpy and Matplotlib")
-# plot the many values of X versus A, the plot function does the imaging
-plt.plot(A, X, ',', color='white', alpha=0.1)
-# set title, labels and ticks
-plt.gca().set_xlabel('a', fontsize=15)
-plt.gca().set_ylabel('x', fontsize=15)
-plt.xticks(fontsize=12)
-plt.yticks(fontsize=12)
-plt.axis('on')
-plt.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.07)
-# make plot visible
-plt.show()
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the chunks import it
+if __name__ == "__main__":
+    print(f"Iterating through {loops} steps, with values for A from {astart} to {aend}")
+    if sweep_mode == "chunks":
+        # the x values are stored as float32, with several processes directly in shared memory
+        X = sweep_orbit("logistic", astart, aend, loops, number_chunks, burn_in=chunk_burn_in,
+                        x_initial=0.5, number_processes=number_processes)
+    else:
+        # the numpy array to contain the values for parameter a
+        A = sweep_a(astart, aend, loops, np.arange(loops))
+        # the numpy array to contain the x values of the logistic map is fllled with zeros
+        X = np.zeros(loops)
+        # the first value is initiated
+        X[0]=0.5
+        # loops iterate the logistic map function for small increases of A
+        for index in range(loops - 1):
+            X[index+1] = A[index] * X[index] * (1.0 - X[index])
+    print(f"Iterations complete, numpy array X has length {X.shape[0]}")
 
+    # Lyapunov exponent and period of each column of the orbit
+    analysis = sweep_analysis("logistic", astart, aend, X, number_columns, max_period = max_period)
+    print(f"{number_columns} columns: {np.count_nonzero(analysis['lyapunov'] > 0)} chaotic (Lyapunov exponent > 0), "
+          f"{np.count_nonzero(analysis['period'])} periodic with period {max_period} or less")
+    if analysis_filename is not None:
+        np.savez_compressed(analysis_filename, **analysis)
+        print(f"Lyapunov exponent and period of each column saved as {analysis_filename}")
 
+    # plot with dark background
+    plt.style.use('dark_background')
+    # set the size of the plot, the diagram on top and the Lyapunov exponent below it
+    fig, (ax, ax_lyapunov) = plt.subplots(2, 1, figsize=(15, 10), sharex=True, height_ratios=(3, 1),
+                                          num="Logistic map using Python, Numpy and Matplotlib")
+    # plot the many values of X versus A, the plot function does the imaging,
+    # the values of A are only calculated for the plotted points
+    plot_steps = np.arange(0, loops, max(1, loops // plot_points))
+    ax.plot(sweep_a(astart, aend, loops, plot_steps), X[plot_steps], ',', color='white', alpha=0.1)
+    # the Lyapunov exponent of each column, the periodic columns in another color
+    periodic = analysis['period'] > 0
+    ax_lyapunov.plot(analysis['a'], analysis['lyapunov'], color='white', linewidth=0.5)
+    ax_lyapunov.plot(analysis['a'][periodic], analysis['lyapunov'][periodic], '.', color='tab:orange',
+                     markersize=2, label='periodic')
+    ax_lyapunov.axhline(0, color='gray', linewidth=0.5)
+    ax_lyapunov.legend(loc='lower left')
+    # set title, labels and ticks
+    ax_lyapunov.set_xlabel('a', fontsize=15)
+    ax.set_ylabel('x', fontsize=15)
+    ax_lyapunov.set_ylabel('Lyapunov', fontsize=15)
+    for axis in (ax, ax_lyapunov):
+        axis.tick_params(labelsize=12)
+    plt.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.07, hspace=0.05)
+    # make plot visible
+    plt.show()
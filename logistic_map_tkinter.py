@@ -2,39 +2,73 @@
 # https://en.wikipedia.org/wiki/Logistic_map
 # https://en.wikipedia.org/wiki/Bifurcation_diagram
 # the diagram is plotted using tkinter which comes with CPython
+# the columns are calculated in blocks by the numpy code of bifurcation_engine.py, all columns of
+# a block at once, optionally by several processes. Each finished block is drawn at once in a
+# single PhotoImage, so the diagram appears block by block instead of line by line.
 #
+import time
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from bifurcation_engine import bifurcation_histogram
 
 # parameters
 screen_width = 1600; screen_height = 1000 # image size in pixels
 a_start = 3.5; a_end = 4.0 # interval parameter a
 log_map_scale_factor = 15 # makes map appear brighter
 number_iterations = 2000 # number of iterations on logistic formula
-# make tkinter and canvas objects
-root = tk.Tk()
-root.title("Logistic map using Python and Tkinter")
-canvas1 = tk.Canvas(root, background = "black",
-           height = screen_height, width = screen_width)
-canvas1.pack()
-# calculating and plotting logistic map
-a_span = a_end - a_start
-for x in range(screen_width):
-    a = a_start + a_span * x / (screen_width - 1) 
-    z = 0.5
-    log_map_lst = [0] * screen_height 
-    for _ in range(number_iterations):
-        z = a * z *(1 - z)
-        log_map_lst[ int(z * (screen_height - 1)) ] += 1
-    for y in range(screen_height):
-        col = min(255, log_map_lst[y] * log_map_scale_factor) 
-        col_str = f"#{col:02X}{col:02X}{col:02X}" 
-        canvas1.create_line(x, screen_height - y - 1, x + 1, screen_height - y - 1,
-                            fill = col_str)
-    if x % 50 == 0:
-        canvas1.update() # each 50 cycles show updated canvas
-# plotting finished, window shows
-canvas1.update()
+burn_in = 0 # iterations which are not drawn, 0: the transient from z = 0.5 is drawn too
+columns_per_block = 100 # columns calculated and drawn together
+number_processes = 1 # None: use all cores, 1: calculate in the tkinter process
 
-tk.mainloop()
+# calculates the grey values of the columns start up to start + columns_per_block,
+# the top row is z = 1
+def calc_block(start):
+    a = a_start + (a_end - a_start) * np.arange(start, min(start + columns_per_block, screen_width)) / (screen_width - 1)
+    # z is counted in row int(z * (screen_height - 1))
+    log_map, z = bifurcation_histogram("logistic", a, number_iterations, screen_height,
+                                       x_range = (0.0, screen_height / (screen_height - 1)),
+                                       burn_in = burn_in, x_initial = 0.5)
+    col = np.minimum(log_map[::-1].astype(np.uint32) * log_map_scale_factor, 255)
+    return start, col.astype(np.uint8)
 
+# the blocks in the order in which they are finished
+def calculated_blocks(executor):
+    starts = range(0, screen_width, columns_per_block)
+    if executor is None:
+        return map(calc_block, starts)
+    return (future.result() for future in as_completed([executor.submit(calc_block, start) for start in starts]))
 
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the blocks import it
+if __name__ == "__main__":
+    # make tkinter and canvas objects
+    root = tk.Tk()
+    root.title("Logistic map using Python and Tkinter")
+    canvas1 = tk.Canvas(root, background = "black",
+               height = screen_height, width = screen_width)
+    canvas1.pack()
+    image1 = tk.PhotoImage(width = screen_width, height = screen_height)
+    canvas1.create_image(0, 0, image = image1, anchor = "nw")
+    # calculating and plotting logistic map
+    executor = None if number_processes == 1 else ProcessPoolExecutor(max_workers = number_processes)
+    blocks = calculated_blocks(executor)
+    columns_done = 0
+    start_time = time.perf_counter()
+
+    # draws one finished block as binary PGM data in the image, then lets tkinter handle events
+    def draw_next_block():
+        global columns_done
+        for start, col in blocks:
+            image1.put(f"P5 {col.shape[1]} {screen_height} 255 ".encode() + col.tobytes(), to = (start, 0))
+            columns_done += col.shape[1]
+            print(f"{columns_done} of {screen_width} columns drawn\r", end = "")
+            root.after(1, draw_next_block)
+            return
+        # plotting finished
+        if executor is not None:
+            executor.shutdown()
+        print(f"\nLogistic map drawn in {time.perf_counter() - start_time:.2f} s")
+
+    root.after(1, draw_next_block)
+    tk.mainloop()
@@ -1,26 +1,31 @@
-# Mandelbrot Fractal using only math and PIL libraries
-from PIL import Image, ImageDraw
+# Mandelbrot Fractal using numpy and the PIL library
+# the iteration counts are calculated in tiles on several processes,
+# see render_tiled() in escape_time_engine.py, the colors are applied with
+# a lookup table and the complete image is passed to PIL at once
+from functools import partial
+import numpy as np
+from PIL import Image
+from escape_time_engine import render_tiled, mandelbrot_index_tile, mandelbrot_index_tile_python
 # parameters
 screen_width = 1500; screen_height = 1000 # image size in pixels
-# a new PIL Image object
-img = Image.new("RGB",(screen_width, screen_height),
-                "black")
-draw = ImageDraw.Draw(img)
-# calculation and plotting
-for x in range(0, screen_width):
-    re = x / (screen_width - 1) * 3.2 - 2.3
-    for y in range(0, screen_height):
-        im = y / (screen_height - 1) * 2.4 - 1.22
-        c = complex(re, im) # value for c
-        z = 0.0
-        for i in range(256): # counter will be measure how fast z grows
-            z = z**2 + c
-            if abs(z) > 2.0:
-                break
-        i_mod = i % 17 * 16; i_mod = min(255, i_mod)
-        col = (i,i,i_mod)
-        draw.point([x, y], fill = col) # add the point  on the image
-    if x % 100 == 0:
-        print(f"{x/(screen_width-1):.0%} calculated")
-# plotting finished, image opens in standard img viewer
-img.show()
+number_processes = None # None: use all cores, 1: calculate in a single process
+backend = "numpy" # "numpy": vectorized calculation, "python": pure CPython loops as reference
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the image tiles import it
+if __name__ == "__main__":
+    # calculation, the values for c are re + j * im
+    re_values = np.arange(screen_width) / (screen_width - 1) * 3.2 - 2.3
+    im_values = np.arange(screen_height) / (screen_height - 1) * 2.4 - 1.22
+    # counter i for each pixel will be measure how fast z grows
+    tile_function = {"numpy": mandelbrot_index_tile,
+                     "python": mandelbrot_index_tile_python}[backend]
+    i_array = render_tiled(partial(tile_function, number_iterations = 256),
+                           re_values, im_values, np.uint8, number_processes = number_processes)
+    # lookup table with the color (i, i, i % 17 * 16) for each possible value of i
+    i = np.arange(256)
+    i_mod = np.minimum(255, i % 17 * 16)
+    color_table = np.stack((i, i, i_mod), axis = -1).astype(np.uint8)
+    # plotting, the lookup table turns the array of counters into an array of RGB colors
+    img = Image.fromarray(color_table[i_array], "RGB")
+    # plotting finished, image opens in standard img viewer
+    img.show()
@@ -2,6 +2,14 @@
 # this script uses ansi commands to set colors
 # it is designed for text consoles with ansi compatibility
 
+# values of c in the main cardioid or in the period 2 bulb never escape,
+# they can be recognised without any iterations
+def in_cardioid_or_bulb(re,im):
+    q=(re-0.25)**2+im*im
+    if q*(q+(re-0.25))<=0.25*im*im: # main cardioid
+        return True
+    return (re+1)**2+im*im<=0.0625 # period 2 bulb
+
 width=180 # width of output in characters
 height=52 # height of output in characters
 print("\033[01m") # ansi command to set bold characters 
@@ -12,9 +20,18 @@ for y in range(height):
         c=complex(re,im) # complex number c is vreated
         z=0
         i=0
+        z_saved=0 # earlier value of z to detect a repeating orbit
+        next_save=1 # z_saved is renewed after 1, 2, 4, 8, ... iterations
+        if in_cardioid_or_bulb(re,im):
+            i=255
         while abs(z)<2 and i<255: # loop with c as constant
             z=z**2+c # iteration for mandelbrot
             i+=1 # keep track of number of loops this value is the used result
+            if z==z_saved: # the orbit repeats itself, z will never go to infinity
+                i=255
+            elif i==next_save:
+                z_saved=z
+                next_save*=2
         if i==255: # print spaces if loop ended without z going to infinity
             print("  ",end="")
         else:
@@ -6,8 +6,13 @@
 #
 # This version has parameters set to view the complete Mandelbrot fractal
 
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
+from functools import partial
+from progress_monitor import ProgressMonitor
+from escape_time_engine import (escape_dtype, render_tiled, render_strips, mandelbrot_tile,
+                                write_strips_npy, PngStripWriter)
 
 # Parameters for calculation
 image_width = 1200
@@ -20,6 +25,17 @@ y_low, y_high = -1.25, 1.25
 # y_low, y_high = -0.012560, -0.00744
 number_iterations = 200 
 z_threshold = 2.0
+number_processes = None # None: use all cores, 1: calculate in a single process
+smooth_coloring = True # True: continuous iteration counts as float32 without color bands, False: integer counts
+# progress reports per completed tile as JSON lines, see progress_monitor.py
+progress_log = None # None: no log, "-": standard output, or a filename such as "progress.jsonl"
+status_file = None # None or a filename such as "status.json" which always holds the latest report
+# render a large poster image directly to disk in bands of band_height rows instead of showing it,
+# the memory used depends on the band height and not on the size of the poster
+render_to_disk = False
+poster_width, poster_height = 40000, 28000
+band_height = 64
+poster_filename = "mandelbrot_poster.png" # ".png": colored image, ".npy": iteration counts
 # Parameters for viewing
 color_background = "#202020"
 vmax_imshow = 100 # upper limit of range on which colormap is applied
@@ -27,68 +43,88 @@ color_map = "CMRmap" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_sp
 png_filename = "mandelbrot.png"
 text_size = 14
 
-print("Mandelbrot Set using Python, numpy and matplotlib")
-print("-------------------------------------------------")
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the image tiles import it
+if __name__ == "__main__":
+    print("Mandelbrot Set using Python, numpy and matplotlib")
+    print("-------------------------------------------------")
 
-# prepare numpy arrays for all values of c, z and the mandelbrot_array image
-x = np.linspace(x_low, x_high, image_width)
-y = np.linspace(y_low, y_high, image_height)
-xx, yy = np.meshgrid(x, y)
-# the array with all complex values for c
-c_array = xx + 1j*yy
-# the array with the initial values for z
-z_array = np.zeros(c_array.shape)
-# the array which will be filled to cantain the mandelbrot_array image
-mandelbrot_array = np.zeros(c_array.shape, dtype = np.uint8)
-# this array contains boolean variables to store which z values exceed the threshold
-z_exceed_threshold_array = np.full(c_array.shape, False)
-print(f"Starting {number_iterations} iterations of {mandelbrot_array.shape} array")
-# the loop calculates z values for the complete array in each iteration
-for counter in range(number_iterations):
-    # calculate the next z values for those elements which do not (yet) exceed threshold
-    z_array = np.where(z_exceed_threshold_array == False, z_array ** 2 + c_array, z_array)
-    # decide which elements of the new z values exceed threshold
-    z_exceed_threshold_array = np.abs(z_array) >= z_threshold
-    # update mandelbrot_array with counter value for those elemenst which exceed threshold for the first time
-    mandelbrot_array = np.where(mandelbrot_array == 0, z_exceed_threshold_array * counter, mandelbrot_array)
-    if counter % 10 == 0:
-        print(f"Iteration {counter} of {number_iterations} completed\r", end = "")
+    if render_to_disk:
+        # the x and y values of the columns and rows of the poster, the rows from top to bottom
+        x = np.linspace(x_low, x_high, poster_width)
+        y = np.linspace(y_high, y_low, poster_height)
+        dtype = np.float32 if smooth_coloring else escape_dtype(number_iterations)
+        print(f"Rendering {(poster_height, poster_width)} poster to \"{poster_filename}\" "
+              f"in bands of {band_height} rows")
+        with ProgressMonitor(poster_width * poster_height, label = "mandelbrot poster", unit = "pixels",
+                             console = False, log_filename = progress_log, status_filename = status_file) as monitor:
+            strips = render_strips(
+                partial(mandelbrot_tile, number_iterations = number_iterations, z_threshold = z_threshold,
+                        smooth = smooth_coloring),
+                x, y, dtype, band_height = band_height, number_processes = number_processes, monitor = monitor)
+            if poster_filename.endswith(".npy"):
+                write_strips_npy(poster_filename, strips, poster_height, poster_width, dtype)
+            else:
+                # 256 colors of the color map, the values from 0 to vmax_imshow are spread over them
+                color_table = (plt.get_cmap(color_map)(np.linspace(0, 1, 256))[:, :3] * 255).astype(np.uint8)
+                poster = PngStripWriter(poster_filename, poster_width, poster_height)
+                for row, band in strips:
+                    color_index = np.clip(band * (255 / vmax_imshow), 0, 255).astype(np.uint8)
+                    poster.write_rows(color_table[color_index])
+                poster.close()
+        print(f"Saved as \"{poster_filename}\"")
+        sys.exit()
 
-# optionally save the mandelbrot array as an png image file
-print(f"Mandelbrot image of {mandelbrot_array.shape} created")
-answer = input(f"Save as \"{png_filename}\" image file? y/n ").lower()
-if answer == "y":
-    plt.imsave(png_filename,
-        mandelbrot_array, 
+    # the x and y values of the columns and rows of the mandelbrot_array image
+    x = np.linspace(x_low, x_high, image_width)
+    y = np.linspace(y_low, y_high, image_height)
+    print(f"Starting {number_iterations} iterations of {(image_height, image_width)} array")
+    # the image is split in tiles which are calculated in parallel by several processes,
+    # the escape time engine only iterates the elements which do not (yet) exceed the threshold,
+    # the returned mandelbrot_array contains the iteration count at which each element exceeded it
+    with ProgressMonitor(image_width * image_height, label = "mandelbrot", unit = "pixels",
+                         console = False, log_filename = progress_log, status_filename = status_file) as monitor:
+        mandelbrot_array = render_tiled(
+            partial(mandelbrot_tile, number_iterations = number_iterations, z_threshold = z_threshold,
+                    smooth = smooth_coloring),
+            x, y, np.float32 if smooth_coloring else escape_dtype(number_iterations),
+            number_processes = number_processes, monitor = monitor)
+
+    # optionally save the mandelbrot array as an png image file
+    print(f"Mandelbrot image of {mandelbrot_array.shape} created")
+    answer = input(f"Save as \"{png_filename}\" image file? y/n ").lower()
+    if answer == "y":
+        plt.imsave(png_filename,
+            mandelbrot_array, 
+            cmap = color_map, 
+            origin='lower',
+            vmin = 0,
+            vmax = vmax_imshow)
+        print(f"Saved as \"{png_filename}\"")
+
+    # create data for axis labels
+    x_label_pos = np.linspace(0, image_width, 10)
+    x_label = [f"{x:.5f}" for x in np.linspace(x_low, x_high, 10)]
+    y_label_pos = np.linspace(0, image_height, 10)
+    y_label = [f"{y:.5f}" for y in np.linspace(y_low, y_high, 10)]
+
+    # display mandelbrot array in a matplotlib window, create new figure object
+    fig = plt.figure(figsize = (15, 10), num = "Mandelbrot", facecolor = color_background)
+    # use dark style wth white letters and set title
+    plt.style.use('dark_background')
+    plt.title("Mandelbrot", 
+                fontsize = text_size + 2, fontweight = "bold", y = 1.02)
+    # set labels on axes
+    plt.xticks(ticks = x_label_pos, labels = x_label)
+    plt.yticks(ticks = y_label_pos, labels = y_label)
+    plt.tick_params(labelsize = text_size)
+    # display the mandelbrot array as an image
+    plt.imshow(mandelbrot_array, 
         cmap = color_map, 
         origin='lower',
         vmin = 0,
         vmax = vmax_imshow)
-    print(f"Saved as \"{png_filename}\"")
-
-# create data for axis labels
-x_label_pos = np.linspace(0, image_width, 10)
-x_label = [f"{x:.5f}" for x in np.linspace(x_low, x_high, 10)]
-y_label_pos = np.linspace(0, image_height, 10)
-y_label = [f"{y:.5f}" for y in np.linspace(y_low, y_high, 10)]
-
-# display mandelbrot array in a matplotlib window, create new figure object
-fig = plt.figure(figsize = (15, 10), num = "Mandelbrot", facecolor = color_background)
-# use dark style wth white letters and set title
-plt.style.use('dark_background')
-plt.title("Mandelbrot", 
-            fontsize = text_size + 2, fontweight = "bold", y = 1.02)
-# set labels on axes
-plt.xticks(ticks = x_label_pos, labels = x_label)
-plt.yticks(ticks = y_label_pos, labels = y_label)
-plt.tick_params(labelsize = text_size)
-# display the mandelbrot array as an image
-plt.imshow(mandelbrot_array, 
-    cmap = color_map, 
-    origin='lower',
-    vmin = 0,
-    vmax = vmax_imshow)
-# define space between image and borders
-plt.subplots_adjust(left = 0.05, right = 0.95, bottom = 0.05, top = 0.915)
+    # define space between image and borders
+    plt.subplots_adjust(left = 0.05, right = 0.95, bottom = 0.05, top = 0.915)
 
-plt.show()
+    plt.show()
@@ -8,6 +8,8 @@
 
 import numpy as np
 import matplotlib.pyplot as plt
+from functools import partial
+from escape_time_engine import escape_dtype, render_tiled, mandelbrot_tile, deep_zoom_escape_time
 
 # Parameters for calculation
 image_width = 1200
@@ -20,6 +22,14 @@ x_low, x_high = 0.278587, 0.285413
 y_low, y_high = -0.012560, -0.00744
 number_iterations = 500 
 z_threshold = 2.0
+number_processes = None # None: use all cores, 1: calculate in a single process
+# deep zoom mode uses perturbation theory around a high precision reference point
+# and allows views far smaller than the float64 limit of a width of about 1e-13
+deep_zoom = False
+# center of the deep zoom view, as strings so no digits are lost
+center_re, center_im = "0", "1" # spirals around c = i
+#center_re, center_im = "-0.7436438870371587", "0.1318259042053119" # use a larger deep_zoom_width
+deep_zoom_width = 1e-100 # width of the deep zoom view, the height follows from the image size
 # Parameters for viewing
 color_background = "#202020"
 vmax_imshow = 500 # upper limit of range on which colormap is applied
@@ -27,68 +37,73 @@ color_map = "CMRmap" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_sp
 png_filename = "mandelbrot.png"
 text_size = 14
 
-print("Mandelbrot Set using Python, numpy and matplotlib")
-print("-------------------------------------------------")
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the image tiles import it
+if __name__ == "__main__":
+    print("Mandelbrot Set using Python, numpy and matplotlib")
+    print("-------------------------------------------------")
 
-# prepare numpy arrays for all values of c, z and the mandelbrot_array image
-x = np.linspace(x_low, x_high, image_width)
-y = np.linspace(y_low, y_high, image_height)
-xx, yy = np.meshgrid(x, y)
-# the array with all complex values for c
-c_array = xx + 1j*yy
-# the array with the initial values for z
-z_array = np.zeros(c_array.shape)
-# the array which will be filled to cantain the mandelbrot_array image
-mandelbrot_array = np.zeros(c_array.shape, dtype = np.uint8)
-# this array contains boolean variables to store which z values exceed the threshold
-z_exceed_threshold_array = np.full(c_array.shape, False)
-print(f"Starting {number_iterations} iterations of {mandelbrot_array.shape} array")
-# the loop calculates z values for the complete array in each iteration
-for counter in range(number_iterations):
-    # calculate the next z values for those elements which do not (yet) exceed threshold
-    z_array = np.where(z_exceed_threshold_array == False, z_array ** 2 + c_array, z_array)
-    # decide which elements of the new z values exceed threshold
-    z_exceed_threshold_array = np.abs(z_array) >= z_threshold
-    # update mandelbrot_array with counter value for those elemenst which exceed threshold for the first time
-    mandelbrot_array = np.where(mandelbrot_array == 0, z_exceed_threshold_array * counter, mandelbrot_array)
-    if counter % 10 == 0:
-        print(f"Iteration {counter} of {number_iterations} completed\r", end = "")
+    if deep_zoom:
+        x_width = deep_zoom_width
+        y_width = deep_zoom_width * (image_height - 1) / (image_width - 1)
+        print(f"Starting {number_iterations} iterations of {(image_height, image_width)} array")
+        print(f"Deep zoom on {center_re} + j * {center_im}, width {x_width:.3e}")
+        # only the reference orbit in the center is calculated with high precision,
+        # all pixels iterate their float64 difference with that orbit
+        mandelbrot_array = deep_zoom_escape_time(center_re, center_im, x_width, y_width,
+            image_width, image_height, number_iterations, z_threshold)
+    else:
+        # the x and y values of the columns and rows of the mandelbrot_array image
+        x = np.linspace(x_low, x_high, image_width)
+        y = np.linspace(y_low, y_high, image_height)
+        print(f"Starting {number_iterations} iterations of {(image_height, image_width)} array")
+        # the image is split in tiles which are calculated in parallel by several processes,
+        # the escape time engine only iterates the elements which do not (yet) exceed the threshold,
+        # the returned mandelbrot_array contains the iteration count at which each element exceeded it
+        mandelbrot_array = render_tiled(
+            partial(mandelbrot_tile, number_iterations = number_iterations, z_threshold = z_threshold),
+            x, y, escape_dtype(number_iterations), number_processes = number_processes)
 
-# optionally save the mandelbrot array as an png image file
-print(f"Mandelbrot image of {mandelbrot_array.shape} created")
-answer = input(f"Save as \"{png_filename}\" image file? y/n ").lower()
-if answer == "y":
-    plt.imsave(png_filename,
-        mandelbrot_array, 
+    # optionally save the mandelbrot array as an png image file
+    print(f"Mandelbrot image of {mandelbrot_array.shape} created")
+    answer = input(f"Save as \"{png_filename}\" image file? y/n ").lower()
+    if answer == "y":
+        plt.imsave(png_filename,
+            mandelbrot_array, 
+            cmap = color_map, 
+            origin='lower',
+            vmin = 0,
+            vmax = vmax_imshow)
+        print(f"Saved as \"{png_filename}\"")
+
+    # create data for axis labels
+    x_label_pos = np.linspace(0, image_width, 10)
+    y_label_pos = np.linspace(0, image_height, 10)
+    if deep_zoom:
+        # the labels show the distance to the center of the view
+        x_label = [f"{x:+.2e}" for x in np.linspace(-x_width / 2, x_width / 2, 10)]
+        y_label = [f"{y:+.2e}" for y in np.linspace(-y_width / 2, y_width / 2, 10)]
+    else:
+        x_label = [f"{x:.5f}" for x in np.linspace(x_low, x_high, 10)]
+        y_label = [f"{y:.5f}" for y in np.linspace(y_low, y_high, 10)]
+
+    # display mandelbrot array in a matplotlib window, create new figure object
+    fig = plt.figure(figsize = (15, 10), num = "Mandelbrot", facecolor = color_background)
+    # use dark style wth white letters and set title
+    plt.style.use('dark_background')
+    plt.title("Mandelbrot", 
+                fontsize = text_size + 2, fontweight = "bold", y = 1.02)
+    # set labels on axes
+    plt.xticks(ticks = x_label_pos, labels = x_label)
+    plt.yticks(ticks = y_label_pos, labels = y_label)
+    plt.tick_params(labelsize = text_size)
+    # display the mandelbrot array as an image
+    plt.imshow(mandelbrot_array, 
         cmap = color_map, 
         origin='lower',
         vmin = 0,
         vmax = vmax_imshow)
-    print(f"Saved as \"{png_filename}\"")
-
-# create data for axis labels
-x_label_pos = np.linspace(0, image_width, 10)
-x_label = [f"{x:.5f}" for x in np.linspace(x_low, x_high, 10)]
-y_label_pos = np.linspace(0, image_height, 10)
-y_label = [f"{y:.5f}" for y in np.linspace(y_low, y_high, 10)]
-
-# display mandelbrot array in a matplotlib window, create new figure object
-fig = plt.figure(figsize = (15, 10), num = "Mandelbrot", facecolor = color_background)
-# use dark style wth white letters and set title
-plt.style.use('dark_background')
-plt.title("Mandelbrot", 
-            fontsize = text_size + 2, fontweight = "bold", y = 1.02)
-# set labels on axes
-plt.xticks(ticks = x_label_pos, labels = x_label)
-plt.yticks(ticks = y_label_pos, labels = y_label)
-plt.tick_params(labelsize = text_size)
-# display the mandelbrot array as an image
-plt.imshow(mandelbrot_array, 
-    cmap = color_map, 
-    origin='lower',
-    vmin = 0,
-    vmax = vmax_imshow)
-# define space between image and borders
-plt.subplots_adjust(left = 0.05, right = 0.95, bottom = 0.05, top = 0.915)
+    # define space between image and borders
+    plt.subplots_adjust(left = 0.05, right = 0.95, bottom = 0.05, top = 0.915)
 
-plt.show()
+    plt.show()
@@ -0,0 +1,132 @@
+# Progress monitor
+# Shared code which reports the progress of long calculations, used by attractor_engine.py and
+# escape_time_engine.py and through them by the attractor and fractal scripts.
+# The calculation only adds the amount of work it has done to a counter now and then, for example
+# after each part of an orbit or each tile. A background thread reads this counter every
+# interval seconds and reports the progress, the speed, the estimated time left, the fill ratio of
+# the histogram and the peak memory use. The reports can be printed, appended as JSON lines to a
+# log file and/or written to a status file which always holds the latest report, so a job
+# scheduler can follow a render without parsing its output.
+# this code is shared without any warranty or implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE
+
+import os
+import sys
+import json
+import time
+import threading
+import multiprocessing
+
+import numpy as np
+
+# the resource module is not available on Windows, the peak memory is then not reported
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# peak memory use of this process in MB, None if unknown
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+# use as:
+#     with ProgressMonitor(total, label = "tinkerbell", log_filename = "log.jsonl") as monitor:
+#         ... monitor.update(number) after each part of the calculation ...
+# total: the amount of work, for example the number of iterations or pixels
+# unit: name of the unit of work in the printed reports
+# histogram: if given, the fraction of its nonzero elements is reported as fill ratio
+# interval: seconds between reports
+# console: print the reports
+# log_filename: each report is appended to this file as one JSON line, "-": standard output
+# status_filename: this file is overwritten with the latest report as JSON
+# the counter is a multiprocessing.Value, worker processes can add to it through update_counter()
+class ProgressMonitor:
+
+    def __init__(self, total, label = "", unit = "iterations", histogram = None, interval = 1.0,
+                 console = True, log_filename = None, status_filename = None):
+        self.total = total
+        self.label = label
+        self.unit = unit
+        self.histogram = histogram
+        self.interval = interval
+        self.console = console
+        self.log_filename = log_filename
+        self.status_filename = status_filename
+        self.counter = multiprocessing.Value("q", 0)
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        self.last_time, self.last_done = self.start_time, 0
+        self.thread = threading.Thread(target = self._run, daemon = True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exception):
+        self.stop_event.set()
+        self.thread.join()
+        self.report(finished = exception[0] is None)
+
+    # add the amount of work done since the last call
+    def update(self, number):
+        update_counter(self.counter, number)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.report()
+
+    # one report: a dictionary which is printed and/or written to the files
+    def report(self, finished = False):
+        now = time.perf_counter()
+        done = self.counter.value
+        elapsed = now - self.start_time
+        # speed over the last interval, the average speed for the final report
+        if finished or now <= self.last_time:
+            rate = done / elapsed if elapsed > 0 else 0.0
+        else:
+            rate = (done - self.last_done) / (now - self.last_time)
+        self.last_time, self.last_done = now, done
+        average_rate = done / elapsed if elapsed > 0 else 0.0
+        record = {"label": self.label, "done": done, "total": self.total,
+                  "elapsed": round(elapsed, 3), "rate": round(rate, 1),
+                  "eta": round((self.total - done) / average_rate, 1) if average_rate > 0 and not finished else None,
+                  "fill_ratio": None, "peak_memory_mb": None, "finished": finished}
+        if self.histogram is not None:
+            record["fill_ratio"] = round(np.count_nonzero(self.histogram) / self.histogram.size, 6)
+        memory = peak_memory_mb()
+        if memory is not None:
+            record["peak_memory_mb"] = round(memory, 1)
+        self._emit(record)
+        return record
+
+    def _emit(self, record):
+        if self.console:
+            text = f"{record['done']} of {self.total} {self.unit}, {record['rate']:.0f} {self.unit}/s"
+            if record["eta"] is not None:
+                text += f", {record['eta']:.0f} s left"
+            if record["fill_ratio"] is not None:
+                text += f", fill ratio {record['fill_ratio']:.4f}"
+            if record["peak_memory_mb"] is not None:
+                text += f", peak memory {record['peak_memory_mb']:.0f} MB"
+            print(text)
+        line = json.dumps(record)
+        if self.log_filename == "-":
+            print(line, flush = True)
+        elif self.log_filename is not None:
+            with open(self.log_filename, "a") as file:
+                file.write(line + "\n")
+        if self.status_filename is not None:
+            # written to a temporary file first so a reader never sees a half written file
+            with open(self.status_filename + ".tmp", "w") as file:
+                file.write(line + "\n")
+            os.replace(self.status_filename + ".tmp", self.status_filename)
+
+# add number to a counter of a ProgressMonitor, also from a worker process
+def update_counter(counter, number):
+    with counter.get_lock():
+        counter.value += number
@@ -21,16 +21,24 @@
 #  
 #  
 # Sierpinski Triangle constructed using the Chaos game method
+# The points of a frame are calculated with the random iteration of ifs_engine.py, many points
+# hop towards the vertices at the same time as numpy arrays. Each frame is drawn as one
+# PhotoImage instead of one canvas rectangle per point, so the animation is no longer limited
+# by the number of canvas items.
 from tkinter import *
-import random as rd
+import numpy as np
 import math
+from ifs_engine import vertex_maps, random_iteration, rasterize, ppm_data
+
+# colors of the points as r, g, b, black is the background
+colors = np.array([(0, 0, 0), (255, 0, 0), (0, 0, 255), (255, 255, 0)], dtype = np.uint8)
 
 class Sierpinski(Tk):
     def __init__(self):
         # execute init of Tk
         super().__init__()
-        # seed the random generator
-        rd.seed()        
+        # random generator seeded by the operating system
+        self.rng = np.random.default_rng()
         # width of the image
         self.width_img = 1024 
         self.half_width = self.width_img // 2
@@ -46,17 +54,19 @@ class Sierpinski(Tk):
             background="black")
         self.C.pack()
         self.resizable(False, False)
+        # one image item on the canvas, it gets a new PhotoImage each frame
+        self.image = PhotoImage(width = self.width_img, height = self.height_img)
+        self.image_item = self.C.create_image(0, 0, image = self.image, anchor = NW)
         
         # number of iterations
         self.N = 20000
         # vertrexes of trangle before scaling starts
         self.x_vertrex = (-50, 0, 50)
         self.y_vertrex = (-30, 50, -30)
-        # x and y variables with start value
+        # x and y variables with start value, one for each of the points which hop at the same time
+        self.number_walkers = 500
         x_current = 500
         y_current = 0
-        # colors to use, black is only for initial values
-        self.colors = ["red","blue","yellow","black"]
         # angle step for rotation, calc sin and cos here once and use variables from there
         self.angle_step = math.radians(7)
         self.angle_cos = math.cos(self.angle_step)
@@ -65,32 +75,20 @@ class Sierpinski(Tk):
         self.scale_steps = (1.05, 1.0 / 1.05)
         self.scale_direction = 0
         self.scale_step = self.scale_steps[self.scale_direction]
-        # random number which denotes the vertrex to use and the previous ones in a list
-        chosen_vertrex = [3] * 4
         # endless outer loop
         while True: 
             # loop which does 1 zooming-in or zooming-out session
             for _ in range(55):
-                # delete previous picture
-                self.C.delete('all')
-                # loop to draw one triangle
-                for index in range(self.N):
-                    # new random vertrex out of 3 and keep 3 previous ones
-                    chosen_vertrex = [rd.randint(0,2)] + chosen_vertrex[0:3]
-                    # calculate new float versions of x and y
-                    x_current = 0.5 * (self.x_vertrex[chosen_vertrex[0]] + x_current)
-                    y_current = 0.5 * (self.y_vertrex[chosen_vertrex[0]] + y_current)
-                    # integer versions with flip in y direction
-                    x_plot = int(x_current) + self.half_width
-                    y_plot = self.half_height - int(y_current)
-                    # using rectangle width and height of 1 seems to give a pixel
-                    self.C.create_rectangle(
-                        x_plot , y_plot ,
-                        x_plot , y_plot ,
-                        #fill = self.colors[chosen_vertrex[3]],
-                        outline = self.colors[chosen_vertrex[3]]) 
+                # the chaos game: each point moves halfway towards a random vertrex out of 3,
+                # the first 8 steps bring the points from the previous triangle to the new one,
+                # each point gets the color of the vertrex chosen 3 steps earlier
+                x_points, y_points, chosen_vertrex, (x_current, y_current) = random_iteration(
+                    (vertex_maps(self.x_vertrex, self.y_vertrex), None), self.N, x_current, y_current,
+                    self.rng, number_walkers = self.number_walkers, burn_in = 8, color_lag = 3)
+                # draw the new triangle
+                self.draw_points(x_points, y_points, chosen_vertrex + 1)
                 # cycling though colors not used here
-                #self.colors = self.colors[1:] + [self.colors[0]]
+                #colors[1:] = np.roll(colors[1:], -1, axis = 0)
                 # rotate and scale the coord. of the 3 vertrexes of the triangle
                 self.rotation_and_scale()
                 # whow newly draw triangle
@@ -99,6 +97,16 @@ class Sierpinski(Tk):
             self.scale_direction = 1 if self.scale_direction == 0 else 0
             # select scaling factor matching the direction
             self.scale_step = self.scale_steps[self.scale_direction]
+
+    # draw the points in an rgb array and show it as one PhotoImage
+    def draw_points(self, x_points, y_points, color_index):
+        # the y direction is flipped, the rows of the array go from top to bottom
+        pixels = rasterize(x_points, y_points, self.width_img, self.height_img,
+                           (-self.half_width, self.half_width), (-self.half_height, self.half_height),
+                           color_index)
+        self.image = PhotoImage(width = self.width_img, height = self.height_img,
+                                data = ppm_data(colors[pixels]), format = "PPM")
+        self.C.itemconfigure(self.image_item, image = self.image)
     
     # rotate and scale the 3 vertrexes of the triangle
     def rotation_and_scale(self):  
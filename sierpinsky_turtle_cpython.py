@@ -1,6 +1,13 @@
-# recursive turtle drawing Sierpinsky Triangle
+# Sierpinsky Triangle drawn level by level in a turtle window
+# The triangles of each recursion depth are calculated with numpy by ifs_engine.py as the
+# compositions of the 3 maps which halve a triangle towards its corners, filled with points and
+# drawn in an image array. The image is shown as one PhotoImage on the canvas of the turtle window,
+# so even deep levels take milliseconds instead of thousands of turtle goto() calls.
 import turtle as tl
 import time
+import numpy as np
+from tkinter import PhotoImage
+from ifs_engine import vertex_maps, level_points, rasterize, ppm_data
 
 # function which draws text at x,y position using turtle
 def text(txt,x,y,font_size=16):
@@ -9,41 +16,49 @@ def text(txt,x,y,font_size=16):
     tl.goto(x,y)
     tl.write(txt,align="center",font=("Sans",font_size,"normal"))
 
-# calculates the x,y of the point exactly in middle of 2 given points
-def midpoint(p1,p2):
-    x1,y1=p1;x2,y2=p2
-    return [(x1+x2)/2,(y1+y2)/2]
+# the colors of the smallest triangles as a recursive drawing gives them: a call with corners p1,p2,p3
+# passes them in another order to its 3 smaller triangles, (p1,p12,p31) red, (p2,p12,p23) green and
+# (p3,p23,p31) blue, so the color is the position of the last corner in the order of its parent,
+# not simply the corner it is nearest to. The triangles are in the order of ifs_engine.py: at each
+# level the index of the corner towards which it is halved, level 0 the most significant digit
+# returns 0 (red), 1 (green) or 2 (blue) for each smallest triangle
+def recursion_colors(depth):
+    number=3**depth
+    order=np.tile(np.arange(3),(number,1)) # the corners of the current triangle in the order of the call
+    position=np.zeros(number,dtype=np.int64)
+    for level in range(depth):
+        corner=np.arange(number)//3**(depth-1-level)%3
+        position=np.argmax(order==corner[:,np.newaxis],axis=1)
+        # the order of the corners passed to the smaller triangle
+        order=np.choose(position[:,np.newaxis],(order,order[:,[1,0,2]],order[:,[2,1,0]]))
+    return position
 
-# recursively called function calls itself with 3 smaller triangles if
-# recursion depth limit is not reached
-# if recursion depth limit is reached, draw a filled rectangle
-# points p1,p2,p3 are tuples of (x,y) coordinates
-# depth is the number of recursive function calls
-# c is the color which will be used at final recursion call
-def triangle(p1,p2,p3,depth,c):
-    if depth==0: # recursion limit is reached, draw filled triangle
-        tl.color(c)
-        tl.penup()
-        tl.goto(p1[0],p1[1])
-        tl.pendown()
-        tl.begin_fill()
-        tl.goto(p2[0],p2[1])
-        tl.goto(p3[0],p3[1])
-        tl.goto(p1[0],p1[1])
-        tl.end_fill()
-        tl.update() 
-    elif depth>0: # recursion limit not reached call function again with 3 smaller triangles
-        pn12=midpoint(p1,p2) 
-        pn23=midpoint(p2,p3)
-        pn31=midpoint(p3,p1)
-        triangle(p1,pn12,pn31,depth-1,"red")
-        triangle(p2,pn12,pn23,depth-1,"green")
-        triangle(p3,pn23,pn31,depth-1,"blue")
+# draws the triangle with corners p1,p2,p3 at the given recursion depth as an image on the turtle canvas
+# the smallest triangles get the colors red, green and blue of a recursive drawing, see recursion_colors()
+# returns the PhotoImage, which has to be kept as long as it is shown
+def triangle(p1,p2,p3,depth):
+    x_vertex,y_vertex=zip(p1,p2,p3)
+    x_range=(min(x_vertex),max(x_vertex)); y_range=(min(y_vertex),max(y_vertex))
+    width=int(x_range[1]-x_range[0])+1; height=int(y_range[1]-y_range[0])+1
+    # the maps which move a point halfway towards each corner, applied depth times to the triangle
+    x,y,map_index,depth=level_points((vertex_maps(x_vertex,y_vertex),None),depth,x_vertex,y_vertex,pixel_size=1)
+    # the points of each smallest triangle follow each other
+    points_per_triangle=len(x)//3**depth
+    pixels=rasterize(x,y,width,height,x_range,y_range,recursion_colors(depth)[np.arange(len(x))//points_per_triangle]+1)
+    image=PhotoImage(width=width,height=height,data=ppm_data(colors[pixels]),format="PPM")
+    # turtle coordinates have y upwards, canvas coordinates downwards,
+    # the image is placed below the text which lies within its rectangle
+    canvas=tl.getcanvas()
+    item=canvas.create_image(x_range[0],-y_range[1],image=image,anchor="nw",tags="triangle")
+    canvas.tag_lower(item)
+    return image
 
 #parameters
 size=600 # defines size of triangle
 y_offset=150 # shifts the triangle upwards to fit screen
-recursion_depth=9 # number of times function triangle() will call itself with succesively smaller triangles
+recursion_depth=9 # number of times the triangle is split in succesively smaller triangles
+# background, red, green and blue as r, g, b, the background has the color of the window
+colors=np.array([(0xe0,0xe0,0xe0),(255,0,0),(0,255,0),(0,0,255)],dtype=np.uint8)
 #define window size
 screen = tl.Screen()
 screen.setup(width=0.8, height=0.9)
@@ -56,12 +71,14 @@ tl.hideturtle()
 
 for current_depth in range(1,recursion_depth):
     tl.clear()
-    tl.tracer(n=current_depth*2) # speed up turtle more as complexity rises
+    tl.getcanvas().delete("triangle")
+    tl.tracer(0) # the text is drawn at once
     # place some text
     text("Sierpinsky Triangle",-3*size//4,size//2+40)
-    text("recursively drawn",-3*size//4,size//2,font_size=12)
-    text("using turtle",-3*size//4,size//2-30,font_size=12)
+    text("drawn level by level",-3*size//4,size//2,font_size=12)
+    text("using numpy and turtle",-3*size//4,size//2-30,font_size=12)
     text(f"recursion depth is {current_depth}",-3*size//4,size//2-60,font_size=12)
-    # first call to "triangle()" function which will recursively call itself "recursion_depth" times
-    triangle([-size,-size+y_offset],[size,-size+y_offset],[0,size//2+y_offset],current_depth,"black")
+    # the triangle after "current_depth" levels of splitting
+    image=triangle([-size,-size+y_offset],[size,-size+y_offset],[0,size//2+y_offset],current_depth)
+    tl.update()
     time.sleep(1)
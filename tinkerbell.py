@@ -1,14 +1,29 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from math import *
+from attractor_engine import render_histogram, tone_map
 
 # parameters for calculation
 image_width=1500
 image_height=1500
 number_iterations = image_width * image_height * 4
+number_processes = 1 # None: use all cores, 1: calculate one orbit in a single process
+random_seed = 1 # seed for the starting points of the orbits in the other processes, None: different each run
+histogram_dtype = np.uint32 # np.uint16 uses half the memory, counts above 65535 are clipped
+bilinear_splatting = False # spread each point over the 4 nearest pixels, smoother images with fewer iterations
+supersampling = 1 # 2 or 4: count with bilinear_splatting at 2 or 4 times the resolution, then add blocks of pixels
+# if this file exists the histogram and orbits saved in it by an earlier run with the same parameters
+# are continued, the new result is saved in it at the end, None: no checkpoint file
+checkpoint_filename = None # for example "tinkerbell_checkpoint.npz"
+# progress reports for a job scheduler, see progress_monitor.py
+progress_log = None # JSON lines are appended to this file, for example "tinkerbell_progress.jsonl", "-": print them
+status_file = None # this file always holds the latest report as JSON
 xrange = (-1.6, 0.8); yrange = (-1.7, 0.8)
 #xrange = (-0.7, 0.1); yrange = (-1.0, -0.2) # zoomed in on the fractal
 #xrange = (-1.3, 0.2); yrange = (-1.6, -0.1)
+# 0: calculate one long orbit, > 0: number of orbits calculated together as numpy arrays,
+# this is much faster when numba is not installed, the first burn_in points of each orbit are skipped
+number_seeds = 0
+burn_in = 100
 # constants for fractal
 a = 0.9 
 b = -0.6013
@@ -17,35 +32,24 @@ d = 0.5
 # Parameters for viewing
 color_background = "#202020"
 color_map = "nipy_spectral" # other examples: "magma" "inferno" "hot" "CMRmap" "nipy_spectral" 
+tone_mapping = "log" # "log", "equalize" (histogram equalization) or "linear"
+gamma = 1.0 # < 1 makes faint areas brighter
 png_filename = "tinkerbell.png"
 text_size = 14
 
 def calc_fractal(N,x_range,y_range):
-    x1, x2 = x_range
-    y1, y2 = y_range
     print(f"Calculating fractal\n{N} iterations\n{image_height} rows, {image_width} colums")
-    fractal=np.zeros((image_height,image_width))
+    fractal=np.zeros((image_height,image_width), dtype = histogram_dtype)
     x,y=0.01, 0.01 # initial values
-    step_feedback = N // 10  # only for printing progress
-    for counter in range(N):
-        x,y = x**2 - y**2 + a*x + b*y, 2*x*y + c*x + d*y
-        column = int(image_width * (x - x1) / (x2 - x1))
-        row = int(image_height *(y - y1) / (y2 - y1))
-        if (row > -1) and (row < image_height) and (column > -1) and (column < image_width):
-            fractal[row,column] += 1
-        if counter % step_feedback == 0:
-            print(f"Iteration {counter} of {number_iterations} completed")
+    # the orbit is iterated and counted by attractor_engine.py, compiled when numba is installed
+    render_histogram("tinkerbell", (a, b, c, d), x, y, N, fractal, x_range, y_range,
+                     number_processes = number_processes, random_seed = random_seed,
+                     number_seeds = number_seeds, burn_in = burn_in,
+                     checkpoint_filename = checkpoint_filename,
+                     splat = bilinear_splatting, supersampling = supersampling,
+                     progress_log = progress_log, status_file = status_file)
     return fractal
 
-def log_convert(fractal):
-    # apply a log conversion for showing and saving fractal
-    # matplotlib.pyplot.imsave() does not seem to support norm="log" option as imshow() does.
-    print("Applying a log conversion for showing and saving fractal")
-    fractal[fractal==0.] = np.nan # avoid log(0) warnings, replace 0.0 with nan
-    fractal = np.log(fractal)
-    fractal[np.isnan(fractal)] = 0. # imsave does not like the nan values, replace nan back with zeros
-    return(fractal)
-
 def save_image(fractal, fname):
     # optionally save the mandelbrot array as an png image file
     print(f"Fractal image of {fractal.shape} created")
@@ -53,7 +57,7 @@ def save_image(fractal, fname):
     if answer == "y":
         plt.imsave(fname,
             fractal, 
-            cmap = color_map, 
+            cmap = color_map, vmin = 0, vmax = 255,
             origin='upper')
         print(f"Saved as \"{fname}\"")
 
@@ -64,16 +68,20 @@ def plot_fractal(fractal):
     plt.title("Tinkerbell Fractal", 
                 fontsize = text_size + 2, fontweight = "bold", y = 1.02)
     plt.imshow(fractal, 
-        cmap = color_map, 
+        cmap = color_map, vmin = 0, vmax = 255,
         origin='upper')
     plt.subplots_adjust(left = 0.05, right = 0.95, bottom = 0.05, top = 0.915)
     plt.show()
 
-# calculate fractal
-pixel_array = calc_fractal(number_iterations, xrange, yrange)
-# log convertion to make smaller values more visible
-pixel_array = log_convert(pixel_array)
-# optionally save as png image file
-save_image(pixel_array, png_filename)
-# display fractal
-plot_fractal(pixel_array)
+# the main code is only run when this file is executed as a script and not when
+# the worker processes which calculate the orbits import it
+if __name__ == "__main__":
+    # calculate fractal
+    pixel_array = calc_fractal(number_iterations, xrange, yrange)
+    # log, equalize or linear conversion to 0...255 to make smaller values more visible
+    print(f"Applying a {tone_mapping} conversion for showing and saving fractal")
+    pixel_array = tone_map(pixel_array, tone_mapping, gamma)
+    # optionally save as png image file
+    save_image(pixel_array, png_filename)
+    # display fractal
+    plot_fractal(pixel_array)